@@ -12,11 +12,13 @@ from .models import (
     MarketVolatilityFlags,
     RequestMetadata,
     DecisionType,
+    Decision,
     # Nested models
     CurrentBalance,
     PortfolioValue,
     TransactionVelocity,
     SuspiciousPatterns,
+    SuspicionFlag,
     DeFiProtocol,
     LendingBorrowing,
     LiquidityDepth,
@@ -27,7 +29,8 @@ from .models import (
 
 from .orchestrator import AgentOrchestrator, analyze_wallet
 from .rules import RuleBasedEngine
-from .llm_reasoning import LLMReasoning
+from .llm_reasoning import LLMReasoning, fallback_analysis
+from .cache import ResultCache
 
 __version__ = "0.1.0"
 
@@ -37,6 +40,8 @@ __all__ = [
     "analyze_wallet",
     "RuleBasedEngine",
     "LLMReasoning",
+    "fallback_analysis",
+    "ResultCache",
     
     # Input/Output models
     "AgentInput",
@@ -51,6 +56,7 @@ __all__ = [
     "PortfolioValue",
     "TransactionVelocity",
     "SuspiciousPatterns",
+    "SuspicionFlag",
     "DeFiProtocol",
     "LendingBorrowing",
     "LiquidityDepth",
@@ -60,4 +66,5 @@ __all__ = [
     
     # Types
     "DecisionType",
+    "Decision",
 ]
@@ -0,0 +1,221 @@
+"""
+Compiled scoring kernels
+
+Scalar and per-batch versions of the rule-based scoring arithmetic, operating
+on plain numbers and NumPy arrays only. Compiled with Numba when it is
+installed; callers check NUMBA_AVAILABLE and otherwise use the pure-Python
+RuleBasedEngine helpers / NumPy batch functions, so the package still runs in
+environments without a JIT (e.g. iExec TEE images).
+"""
+
+import numpy as np
+
+from .models import SuspicionFlag
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+    
+    def njit(*args, **kwargs):
+        """No-op stand-in so the kernels stay importable as plain Python"""
+        return lambda func: func
+
+
+# Decision codes produced by the batch kernel (see batch.DECISIONS)
+NO_ACTION, MONITOR, REQUEST_SEVERITY_ANALYSIS, ENFORCE_ACTION = range(4)
+
+# Lower edges of the MONITOR / high-risk / very-high-risk score bands
+DECISION_BINS = np.array([30.0, 60.0, 80.0])
+
+# Decision code by (score band, has_positive, has_negative); only high risk
+# with conflicting signals is ambiguous enough to need the LLM
+DECISION_TABLE = np.array([
+    [[NO_ACTION, NO_ACTION], [NO_ACTION, NO_ACTION]],
+    [[MONITOR, MONITOR], [MONITOR, MONITOR]],
+    [[ENFORCE_ACTION, ENFORCE_ACTION], [ENFORCE_ACTION, REQUEST_SEVERITY_ANALYSIS]],
+    [[ENFORCE_ACTION, ENFORCE_ACTION], [ENFORCE_ACTION, ENFORCE_ACTION]],
+], dtype=np.int64)
+
+_MIXER = int(SuspicionFlag.MIXER)
+_RAPID_DRAINING = int(SuspicionFlag.RAPID_DRAINING)
+_UNUSUAL = int(SuspicionFlag.UNUSUAL)
+_NEW_HIGH_VALUE = int(SuspicionFlag.NEW_HIGH_VALUE)
+_SANCTIONED = int(SuspicionFlag.SANCTIONED)
+_NEGATIVE_SIGNAL_MASK = _MIXER | _RAPID_DRAINING | _UNUSUAL | _NEW_HIGH_VALUE
+
+
+# fastmath is left off: health_factor uses inf for "no lending position",
+# which fastmath is allowed to assume away.
+@njit(cache=True)
+def score_wallet(
+    age, balance_usd, portfolio_usd, velocity_24h, velocity_30d, days_idle,
+    suspicious_flags, health_factor, has_ens, has_gitcoin, has_poap,
+    reputation, credit_score, default_rate, liquidation_events, paused,
+    oracle_stale, oracle_deviation, volatility_index, flash_crash, black_swan,
+    large_liquidations, extreme_congestion
+):
+    """
+    RuleBasedEngine.calculate_risk_score over primitives
+    
+    Unknown reputation/credit score is passed as -1, a missing lending
+    position as an infinite health factor.
+    """
+    score = 0.0
+    
+    # Wallet age
+    if age < 7:
+        score += 20.0
+    elif age < 30:
+        score += 10.0
+    elif age < 90:
+        score += 5.0
+    elif age > 365:
+        score -= 10.0
+    
+    # Balance & portfolio
+    if balance_usd < 100:
+        score += 15.0
+    elif balance_usd < 1000:
+        score += 5.0
+    if age < 30 and balance_usd > 50000:
+        score += 10.0
+    if age > 365 and portfolio_usd > 100000:
+        score -= 5.0
+    
+    # Transaction patterns
+    ratio = 1.0
+    if age != 0 and velocity_30d != 0:
+        ratio = velocity_24h / (velocity_30d / 30.0)
+    if ratio > 5.0:
+        score += 25.0
+    elif ratio > 3.0:
+        score += 15.0
+    elif ratio > 2.0:
+        score += 10.0
+    if days_idle > 90:
+        score += 10.0
+    
+    # Suspicious patterns
+    if suspicious_flags & _RAPID_DRAINING:
+        score += 30.0
+    if suspicious_flags & _MIXER:
+        score += 25.0
+    if suspicious_flags & _NEW_HIGH_VALUE:
+        score += 20.0
+    if suspicious_flags & _UNUSUAL:
+        score += 15.0
+    if suspicious_flags & _SANCTIONED:
+        score += 50.0
+    
+    # Reputation
+    if has_ens:
+        score -= 10.0
+    if has_gitcoin:
+        score -= 15.0
+    if has_poap:
+        score -= 5.0
+    if reputation > 70:
+        score -= 10.0
+    if credit_score > 700:
+        score -= 15.0
+    
+    # DeFi health
+    if health_factor < 1.05:
+        score += 50.0
+    elif health_factor < 1.1:
+        score += 40.0
+    elif health_factor < 1.2:
+        score += 30.0
+    elif health_factor < 1.5:
+        score += 20.0
+    elif health_factor < 2.0:
+        score += 10.0
+    
+    # Protocol health
+    if default_rate > 10.0:
+        score += 25.0
+    elif default_rate > 5.0:
+        score += 15.0
+    if liquidation_events > 20:
+        score += 20.0
+    elif liquidation_events > 10:
+        score += 10.0
+    if paused:
+        score += 30.0
+    if oracle_stale:
+        score += 25.0
+    if oracle_deviation > 5.0:
+        score += 15.0
+    
+    # Market volatility
+    if volatility_index > 80:
+        score += 30.0
+    elif volatility_index > 70:
+        score += 25.0
+    elif volatility_index > 50:
+        score += 15.0
+    if flash_crash:
+        score += 30.0
+    if black_swan:
+        score += 40.0
+    if large_liquidations:
+        score += 20.0
+    if extreme_congestion:
+        score += 10.0
+    
+    return min(max(score, 0.0), 100.0)
+
+
+@njit(parallel=True, cache=True)
+def score_batch_kernel(
+    age, balance_usd, portfolio_usd, velocity_24h, velocity_30d, days_idle,
+    suspicious_flags, health_factor, has_ens, ens_present, has_gitcoin, has_poap,
+    reputation, credit_score, default_rate, liquidation_events, paused,
+    oracle_stale, oracle_deviation, volatility_index, flash_crash, black_swan,
+    large_liquidations, extreme_congestion
+):
+    """Per-wallet scores, decision codes and confidences for WalletBatch columns"""
+    n = age.shape[0]
+    scores = np.empty(n, dtype=np.float64)
+    decisions = np.empty(n, dtype=np.int64)
+    confidences = np.empty(n, dtype=np.float64)
+    
+    for i in prange(n):
+        score = score_wallet(
+            age[i], balance_usd[i], portfolio_usd[i], velocity_24h[i], velocity_30d[i],
+            days_idle[i], suspicious_flags[i], health_factor[i], has_ens[i], has_gitcoin[i],
+            has_poap[i], reputation[i], credit_score[i], default_rate[i], liquidation_events[i],
+            paused[i], oracle_stale[i], oracle_deviation[i], volatility_index[i], flash_crash[i],
+            black_swan[i], large_liquidations[i], extreme_congestion[i]
+        )
+        scores[i] = score
+        
+        # Decision
+        flags = suspicious_flags[i]
+        critical = (
+            (flags & _SANCTIONED) != 0 or
+            (health_factor[i] < 1.05 and volatility_index[i] > 70) or
+            paused[i]
+        )
+        if critical:
+            decisions[i] = ENFORCE_ACTION
+        else:
+            band = int(score >= 30.0) + int(score >= 60.0) + int(score >= 80.0)
+            has_positive = ens_present[i] or has_gitcoin[i] or age[i] > 365 or reputation[i] > 70
+            has_negative = (flags & _NEGATIVE_SIGNAL_MASK) != 0
+            decisions[i] = DECISION_TABLE[band, int(has_positive), int(has_negative)]
+        
+        # Confidence (lower near the 30/60/80 boundaries)
+        min_distance = min(abs(score - 30.0), abs(score - 60.0), abs(score - 80.0))
+        if min_distance >= 10:
+            confidences[i] = 90.0
+        elif min_distance >= 5:
+            confidences[i] = 75.0
+        else:
+            confidences[i] = 60.0
+    
+    return scores, decisions, confidences
+
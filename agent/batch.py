@@ -0,0 +1,287 @@
+"""
+Vectorized batch scoring
+
+Packs the scoring fields of many AgentInputs into one compact NumPy record
+array (WALLET_DTYPE) and views it as a structure of arrays, so the rule-based
+risk score, decision and confidence are computed for the whole batch at once
+instead of wallet by wallet. Mirrors RuleBasedEngine exactly.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+
+from ._kernels import (
+    NUMBA_AVAILABLE, REQUEST_SEVERITY_ANALYSIS, ENFORCE_ACTION,
+    DECISION_BINS, DECISION_TABLE, score_batch_kernel
+)
+from .models import AgentInput, SuspicionFlag
+from .rules import (
+    AGE_EDGES, AGE_WEIGHTS, BALANCE_EDGES, BALANCE_WEIGHTS,
+    VELOCITY_RATIO_EDGES, VELOCITY_RATIO_WEIGHTS, HEALTH_FACTOR_EDGES, HEALTH_FACTOR_WEIGHTS,
+    DEFAULT_RATE_EDGES, DEFAULT_RATE_WEIGHTS, LIQUIDATION_EDGES, LIQUIDATION_WEIGHTS,
+    VOLATILITY_EDGES, VOLATILITY_WEIGHTS, PATTERN_SCORES
+)
+
+
+# Suspicious-pattern score indexed by the packed bitmask
+_PATTERN_SCORES = np.array(PATTERN_SCORES)
+
+_SANCTIONED = int(SuspicionFlag.SANCTIONED)
+_NEGATIVE_SIGNAL_MASK = int(
+    SuspicionFlag.MIXER | SuspicionFlag.RAPID_DRAINING |
+    SuspicionFlag.UNUSUAL | SuspicionFlag.NEW_HIGH_VALUE
+)
+
+# Fixed-size record holding every field the rule-based scoring reads
+# (one row per wallet, under 70 bytes instead of a few dozen Python objects)
+WALLET_DTYPE = np.dtype([
+    # Wallet signals
+    ('age', 'i4'),
+    ('balance_usd', 'f8'),
+    ('portfolio_usd', 'f8'),
+    ('velocity_24h', 'i4'),
+    ('velocity_30d', 'i4'),
+    ('days_idle', 'i4'),
+    ('suspicious_flags', 'u1'),
+    ('health_factor', 'f8'),  # inf when there is no lending position
+    ('has_ens', '?'),  # ens_name is truthy
+    ('ens_present', '?'),  # ens_name is not None
+    ('has_gitcoin', '?'),
+    ('has_poap', '?'),
+    ('reputation', 'i1'),  # quantized, -1 when unknown
+    ('credit_score', 'i2'),  # quantized, -1 when unknown
+    
+    # Protocol health
+    ('default_rate', 'i1'),  # quantized
+    ('liquidation_events', 'i4'),
+    ('paused', '?'),
+    ('oracle_stale', '?'),
+    ('oracle_deviation', 'f8'),
+    
+    # Market volatility
+    ('volatility_index', 'i1'),  # quantized
+    ('flash_crash', '?'),
+    ('black_swan', '?'),
+    ('large_liquidations', '?'),
+    ('extreme_congestion', '?'),
+])
+
+
+def _quantize(value: float, upper: int) -> int:
+    """
+    Snap a score/percentage to an integer bucket
+    
+    Every rule compares these fields as ``value > N`` with integer N, and
+    ``value > N`` holds exactly when ``ceil(value) > N``, so rounding up keeps
+    every threshold decision unchanged. Non-finite values are clamped first:
+    NaN clears no threshold (bucket 0) and infinities land on the bounds.
+    """
+    if math.isnan(value):
+        return 0
+    return math.ceil(min(max(value, 0), upper))
+
+
+@dataclass(slots=True)
+class WalletBatch:
+    """Structure-of-arrays view of a WALLET_DTYPE record array (one entry per wallet)"""
+    # Wallet signals
+    age: np.ndarray
+    balance_usd: np.ndarray
+    portfolio_usd: np.ndarray
+    velocity_24h: np.ndarray
+    velocity_30d: np.ndarray
+    days_idle: np.ndarray
+    suspicious_flags: np.ndarray
+    health_factor: np.ndarray
+    has_ens: np.ndarray
+    ens_present: np.ndarray
+    has_gitcoin: np.ndarray
+    has_poap: np.ndarray
+    reputation: np.ndarray
+    credit_score: np.ndarray
+    
+    # Protocol health
+    default_rate: np.ndarray
+    liquidation_events: np.ndarray
+    paused: np.ndarray
+    oracle_stale: np.ndarray
+    oracle_deviation: np.ndarray
+    
+    # Market volatility
+    volatility_index: np.ndarray
+    flash_crash: np.ndarray
+    black_swan: np.ndarray
+    large_liquidations: np.ndarray
+    extreme_congestion: np.ndarray
+    
+    @classmethod
+    def from_records(cls, records: np.ndarray) -> 'WalletBatch':
+        """View each field of a WALLET_DTYPE record array as a column (no copy)"""
+        return cls(*(records[name] for name in WALLET_DTYPE.names))
+    
+    @classmethod
+    def from_inputs(cls, inputs: List[AgentInput]) -> 'WalletBatch':
+        """Extract every scoring field in one pass over the inputs"""
+        return cls.from_records(to_records(inputs))
+    
+    def __len__(self) -> int:
+        return len(self.age)
+
+
+def to_record(agent_input: AgentInput) -> Tuple:
+    """Flatten one AgentInput into a WALLET_DTYPE row"""
+    signals = agent_input.wallet_signals
+    protocol = agent_input.protocol_health
+    market = agent_input.market_volatility
+    lb = signals.lending_borrowing
+    
+    return (
+        signals.age_in_days,
+        signals.current_balance.total_usd,
+        signals.portfolio_value.total_usd,
+        signals.transaction_velocity.last_24h,
+        signals.transaction_velocity.last_30d,
+        signals.days_since_last_activity,
+        signals.suspicious_patterns.flags,
+        lb.health_factor if lb else np.inf,
+        bool(signals.ens_name),
+        signals.ens_name is not None,
+        signals.has_gitcoin_passport,
+        signals.has_poap,
+        -1 if signals.on_chain_reputation is None else _quantize(signals.on_chain_reputation, 127),
+        -1 if signals.credit_score is None else _quantize(signals.credit_score, 32767),
+        
+        _quantize(protocol.default_rate, 127),
+        protocol.liquidation_events_24h,
+        bool(protocol.paused_contracts),
+        not protocol.oracle_freshness,
+        protocol.oracle_deviation,
+        
+        _quantize(market.volatility_index, 127),
+        market.flash_crash_detected,
+        market.black_swan_event,
+        market.large_liquidations_in_progress,
+        market.network_congestion == 'EXTREME',
+    )
+
+
+def to_records(inputs: List[AgentInput]) -> np.ndarray:
+    """Pack the scoring fields of many AgentInputs into a WALLET_DTYPE record array"""
+    return np.array([to_record(agent_input) for agent_input in inputs], dtype=WALLET_DTYPE)
+
+
+def _below(edges, weights, values: np.ndarray) -> np.ndarray:
+    """Vectorized rules._below: tier weight for "value < edge" tables"""
+    return np.asarray(weights)[np.searchsorted(edges, values, side='right')]
+
+
+def _above(edges, weights, values: np.ndarray) -> np.ndarray:
+    """Vectorized rules._above: tier weight for "value > edge" tables"""
+    return np.asarray(weights)[np.searchsorted(edges, values, side='left')]
+
+
+def score_batch(batch: WalletBatch) -> np.ndarray:
+    """Vectorized RuleBasedEngine.calculate_risk_score (0-100 per wallet)"""
+    age = batch.age
+    
+    # Wallet age
+    score = _below(AGE_EDGES, AGE_WEIGHTS, age)
+    
+    # Balance & portfolio
+    balance = batch.balance_usd
+    score += _below(BALANCE_EDGES, BALANCE_WEIGHTS, balance)
+    score += np.where((age < 30) & (balance > 50000), 10.0, 0.0)
+    score -= np.where((age > 365) & (batch.portfolio_usd > 100000), 5.0, 0.0)
+    
+    # Transaction patterns (24h activity vs 30d daily average)
+    has_history = (age != 0) & (batch.velocity_30d != 0)
+    avg_daily = np.where(has_history, batch.velocity_30d / 30.0, 1.0)
+    ratio = np.where(has_history, batch.velocity_24h / avg_daily, 1.0)
+    score += _above(VELOCITY_RATIO_EDGES, VELOCITY_RATIO_WEIGHTS, ratio)
+    score += np.where(batch.days_idle > 90, 10.0, 0.0)
+    
+    # Suspicious patterns: one gather from the bitmask lookup table
+    score += _PATTERN_SCORES[batch.suspicious_flags]
+    
+    # Reputation (the -1 "unknown" sentinel never clears a threshold)
+    score -= np.where(batch.has_ens, 10.0, 0.0)
+    score -= np.where(batch.has_gitcoin, 15.0, 0.0)
+    score -= np.where(batch.has_poap, 5.0, 0.0)
+    score -= np.where(batch.reputation > 70, 10.0, 0.0)
+    score -= np.where(batch.credit_score > 700, 15.0, 0.0)
+    
+    # DeFi health
+    score += _below(HEALTH_FACTOR_EDGES, HEALTH_FACTOR_WEIGHTS, batch.health_factor)
+    
+    # Protocol health
+    score += _above(DEFAULT_RATE_EDGES, DEFAULT_RATE_WEIGHTS, batch.default_rate)
+    score += _above(LIQUIDATION_EDGES, LIQUIDATION_WEIGHTS, batch.liquidation_events)
+    score += np.where(batch.paused, 30.0, 0.0)
+    score += np.where(batch.oracle_stale, 25.0, 0.0)
+    score += np.where(batch.oracle_deviation > 5.0, 15.0, 0.0)
+    
+    # Market volatility
+    score += _above(VOLATILITY_EDGES, VOLATILITY_WEIGHTS, batch.volatility_index)
+    score += np.where(batch.flash_crash, 30.0, 0.0)
+    score += np.where(batch.black_swan, 40.0, 0.0)
+    score += np.where(batch.large_liquidations, 20.0, 0.0)
+    score += np.where(batch.extreme_congestion, 10.0, 0.0)
+    
+    return np.clip(score, 0.0, 100.0, out=score)
+
+
+def decide_batch(scores: np.ndarray, batch: WalletBatch) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized RuleBasedEngine.map_score_to_decision
+    
+    Returns:
+        Tuple of (decision codes indexing DECISIONS, needs_llm mask)
+    """
+    critical = (
+        (batch.suspicious_flags & _SANCTIONED).astype(bool) |
+        ((batch.health_factor < 1.05) & (batch.volatility_index > 70)) |
+        batch.paused
+    )
+    has_positive = (
+        batch.ens_present | batch.has_gitcoin | (batch.age > 365) | (batch.reputation > 70)
+    )
+    has_negative = (batch.suspicious_flags & _NEGATIVE_SIGNAL_MASK).astype(bool)
+    
+    bands = np.digitize(scores, DECISION_BINS)
+    decisions = np.where(
+        critical,
+        ENFORCE_ACTION,
+        DECISION_TABLE[bands, has_positive.astype(np.intp), has_negative.astype(np.intp)]
+    )
+    return decisions, decisions == REQUEST_SEVERITY_ANALYSIS
+
+
+def confidence_batch(scores: np.ndarray) -> np.ndarray:
+    """Vectorized rule-based confidence (lower near the 30/60/80 boundaries)"""
+    min_distance = np.min(np.abs(scores[:, None] - np.array([30.0, 60.0, 80.0])), axis=1)
+    return np.where(min_distance >= 10, 90.0, np.where(min_distance >= 5, 75.0, 60.0))
+
+
+def evaluate_batch(batch: WalletBatch) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Score a whole batch, with the compiled kernel when Numba is available
+    
+    Returns:
+        Tuple of (risk scores, decision codes indexing DECISIONS, confidences)
+    """
+    if NUMBA_AVAILABLE:
+        return score_batch_kernel(
+            batch.age, batch.balance_usd, batch.portfolio_usd, batch.velocity_24h,
+            batch.velocity_30d, batch.days_idle, batch.suspicious_flags, batch.health_factor,
+            batch.has_ens, batch.ens_present, batch.has_gitcoin, batch.has_poap,
+            batch.reputation, batch.credit_score, batch.default_rate, batch.liquidation_events,
+            batch.paused, batch.oracle_stale, batch.oracle_deviation, batch.volatility_index,
+            batch.flash_crash, batch.black_swan, batch.large_liquidations, batch.extreme_congestion
+        )
+    
+    scores = score_batch(batch)
+    decisions, _ = decide_batch(scores, batch)
+    return scores, decisions, confidence_batch(scores)
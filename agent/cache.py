@@ -0,0 +1,110 @@
+"""
+Content-addressed result cache
+
+Memoizes expensive analysis results (LLM calls) keyed on a stable hash of
+the input signals, so re-analyzing an unchanged wallet snapshot is free.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Any, Optional
+
+import orjson
+
+from .models import AgentInput, MarketVolatilityFlags
+
+
+# Default time-to-live for cached results (seconds)
+DEFAULT_TTL_S = 300.0
+
+# Shorter TTL while the market is moving fast
+VOLATILE_TTL_S = 30.0
+
+# Fields that change on every snapshot without changing the risk picture
+_VOLATILE_FIELDS = frozenset({'first_seen_timestamp', 'last_activity_timestamp', 'last_interaction', 'timestamp'})
+
+
+def _canonicalize(value: Any) -> Any:
+    """Drop per-snapshot timestamps and round floats to coarse buckets"""
+    if isinstance(value, dict):
+        return {k: _canonicalize(v) for k, v in value.items() if k not in _VOLATILE_FIELDS}
+    if isinstance(value, list):
+        return [_canonicalize(v) for v in value]
+    if isinstance(value, float):
+        return round(value, 2)
+    return value
+
+
+def input_fingerprint(agent_input: AgentInput) -> str:
+    """
+    Stable hash of the signals that drive the analysis
+    
+    Request metadata is excluded, so the same wallet snapshot analyzed by
+    different requests maps to the same key.
+    """
+    payload = _canonicalize({
+        'wallet_signals': asdict(agent_input.wallet_signals),
+        'protocol_health': asdict(agent_input.protocol_health),
+        'market_volatility': asdict(agent_input.market_volatility),
+    })
+    encoded = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+def ttl_for_market(market: MarketVolatilityFlags) -> float:
+    """Pick a TTL based on market conditions"""
+    if market.flash_crash_detected or market.black_swan_event:
+        return VOLATILE_TTL_S
+    return DEFAULT_TTL_S
+
+
+class ResultCache:
+    """
+    Thread-safe in-process LRU cache with per-entry TTL
+    """
+    
+    def __init__(self, maxsize: int = 1024):
+        """
+        Initialize the cache
+        
+        Args:
+            maxsize: Max number of entries kept before evicting the least recently used
+        """
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: Any, ttl_s: float = DEFAULT_TTL_S) -> None:
+        """Store a value for ``ttl_s`` seconds"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_s, value)
+            self._entries.move_to_end(key)
+            
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
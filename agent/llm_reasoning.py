@@ -4,10 +4,132 @@ LLM-based reasoning layer
 Provides contextual analysis for ambiguous cases using language models.
 """
 
-import json
-from typing import Dict, Optional
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, get_args
 import openai
-from .models import WalletSignals, ProtocolHealthIndicators, MarketVolatilityFlags, DecisionType
+import orjson
+from .models import (
+    WalletSignals, ProtocolHealthIndicators, MarketVolatilityFlags, DecisionType,
+    Decision, STR_TO_DECISION, SuspicionFlag
+)
+from .rate_limit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+# (wallet_signals, protocol_health, market_volatility, base_risk_score)
+LLMRow = Tuple[WalletSignals, ProtocolHealthIndicators, MarketVolatilityFlags, float]
+
+_VALID_DECISIONS = frozenset(get_args(DecisionType))
+
+# Suspicious-pattern bits described to the LLM as negative indicators
+_NEGATIVE_SIGNAL_TEXT = (
+    (int(SuspicionFlag.MIXER), "Tornado Cash / mixer interaction detected"),
+    (int(SuspicionFlag.RAPID_DRAINING), "Rapid asset drainage pattern"),
+    (int(SuspicionFlag.UNUSUAL), "Unusual transaction activity spike"),
+    (int(SuspicionFlag.NEW_HIGH_VALUE), "New wallet with unusually high value"),
+)
+
+# Transient API failures (429, 5xx, network) worth retrying with backoff
+_RETRYABLE_ERRORS = (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError)
+_MAX_ATTEMPTS = 5
+_BACKOFF_BASE_S = 1.0
+_BACKOFF_JITTER_S = 1.0
+
+# Rough completion budget added to the prompt estimate when reserving tokens
+_COMPLETION_TOKENS_ESTIMATE = 300
+
+_TASK_INSTRUCTIONS = """## Your Task
+1. Assess the TRUE risk level (0-100)
+2. Determine if this is:
+   - Legitimate user exhibiting normal behavior
+   - Privacy-focused user (not malicious)
+   - High-risk borrower
+   - Potential threat/Sybil attack
+   - Victim of compromise
+
+3. Recommend ONE of:
+   - NO_ACTION (safe, continue normal operations)
+   - MONITOR (elevated risk, watch closely)
+   - REQUEST_SEVERITY_ANALYSIS (need more data)
+   - ENFORCE_ACTION (immediate protective action)
+
+4. Provide clear reasoning in 2-3 sentences"""
+
+
+# Static prompt chunks, built once at import instead of on every request
+_PROMPT_HEAD = (
+    "You are an expert DeFi risk analyst. Analyze the following wallet situation "
+    "and provide a nuanced assessment.\n\n"
+)
+
+_PROMPT_TAIL = "\n\n" + _TASK_INSTRUCTIONS + """
+
+## Response Format (JSON only, no other text):
+{
+  "risk_score": <number 0-100>,
+  "classification": "<type>",
+  "decision": "<NO_ACTION|MONITOR|REQUEST_SEVERITY_ANALYSIS|ENFORCE_ACTION>",
+  "reasoning": "<explanation>",
+  "confidence": <number 0-100>
+}"""
+
+_BATCH_PROMPT_HEAD = (
+    "You are an expert DeFi risk analyst. Analyze each of the following {count} wallet "
+    "situations independently and provide a nuanced assessment for every one of them.\n\n"
+)
+
+_BATCH_PROMPT_TAIL = "\n\n" + _TASK_INSTRUCTIONS + """
+
+## Response Format (JSON only, no other text):
+Return one entry per wallet, using the wallet number as "idx".
+{
+  "results": [
+    {
+      "idx": <wallet number>,
+      "risk_score": <number 0-100>,
+      "classification": "<type>",
+      "decision": "<NO_ACTION|MONITOR|REQUEST_SEVERITY_ANALYSIS|ENFORCE_ACTION>",
+      "reasoning": "<explanation>",
+      "confidence": <number 0-100>
+    }
+  ]
+}"""
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Jittered exponential backoff before retry number ``attempt + 1``"""
+    return _BACKOFF_BASE_S * 2 ** attempt + random.random() * _BACKOFF_JITTER_S
+
+
+def fallback_analysis(base_risk_score: float) -> Dict:
+    """
+    Fallback analysis when LLM is unavailable
+    
+    Uses conservative decision-making based on risk score. Pure function of
+    the score, so callers can use it without constructing LLMReasoning.
+    """
+    if base_risk_score >= 75:
+        decision = Decision.ENFORCE_ACTION
+        reasoning = "High risk score detected. LLM unavailable - using conservative approach."
+    elif base_risk_score >= 50:
+        decision = Decision.MONITOR
+        reasoning = "Elevated risk. LLM unavailable - defaulting to monitoring."
+    else:
+        decision = Decision.NO_ACTION
+        reasoning = "Risk within acceptable range."
+    
+    return {
+        'risk_score': base_risk_score,
+        'decision': decision,
+        'reasoning': reasoning,
+        'confidence': 60,  # Lower confidence without LLM
+        'classification': 'Automated fallback'
+    }
 
 
 class LLMReasoning:
@@ -18,17 +140,59 @@ class LLMReasoning:
     nuanced understanding.
     """
     
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4"):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "gpt-4",
+        max_rows_per_request: int = 8,
+        requests_per_minute: int = 500,
+        tokens_per_minute: int = 90_000
+    ):
         """
         Initialize LLM reasoning module
         
         Args:
             api_key: Optional API key for LLM provider
             model: Model identifier (e.g., "gpt-4", "claude-3")
+            max_rows_per_request: Max wallets marshaled into one batched LLM call
+            requests_per_minute: Request quota enforced on async calls
+            tokens_per_minute: Token quota enforced on async calls
         """
         self.api_key = api_key
         self.model = model
+        self.max_rows_per_request = max(1, max_rows_per_request)
         self._llm_available = api_key is not None
+        self._rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        
+        # One client per instance keeps the HTTP connection pool (and TLS
+        # sessions) alive across calls; the client is thread-safe. Both are
+        # created on the first LLM call, which most analyses never make. The
+        # async client is bound to the event loop it was created in.
+        self._client: Optional[openai.OpenAI] = None
+        self._client_lock = threading.Lock()
+        self._async_client: Optional[openai.AsyncOpenAI] = None
+        self._async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    @property
+    def client(self) -> Optional[openai.OpenAI]:
+        """Sync API client, or None without an API key"""
+        if self._client is None and self.api_key:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = openai.OpenAI(api_key=self.api_key)
+        return self._client
+    
+    def close(self) -> None:
+        """Release the HTTP connection pool of the sync client"""
+        if self._client is not None:
+            self._client.close()
+    
+    async def aclose(self) -> None:
+        """Release the HTTP connection pool of the async client"""
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+            self._async_client_loop = None
     
     def analyze(
         self,
@@ -49,9 +213,25 @@ class LLMReasoning:
         Returns:
             Dictionary with LLM decision and reasoning
         """
+        verdict = self.verdict(wallet_signals, protocol_health, market_volatility, base_risk_score)
+        return self.finalize(verdict, base_risk_score)
+    
+    def verdict(
+        self,
+        wallet_signals: WalletSignals,
+        protocol_health: ProtocolHealthIndicators,
+        market_volatility: MarketVolatilityFlags,
+        base_risk_score: float
+    ) -> Optional[Dict]:
+        """
+        Raw LLM verdict for one wallet, before it is blended with the
+        rule-based score by finalize()
+        
+        Returns:
+            The LLM response dictionary, or None when no LLM is configured
+        """
         if not self._llm_available:
-            # Fallback to rule-based decision
-            return self._fallback_analysis(base_risk_score)
+            return None
         
         # Build prompt
         prompt = self._build_prompt(
@@ -62,10 +242,141 @@ class LLMReasoning:
         )
         
         # Call LLM (placeholder - would integrate with actual LLM API)
-        llm_response = self._call_llm(prompt)
+        return self._call_llm(prompt)
+    
+    def finalize(self, verdict: Optional[Dict], base_risk_score: float) -> Dict:
+        """
+        Turn a raw verdict into the final result for one rule-based score
+        
+        Safety overrides and score blending depend on ``base_risk_score``,
+        so a cached verdict must go through here again for every request.
+        """
+        if verdict is None:
+            # Fallback to rule-based decision
+            return fallback_analysis(base_risk_score)
         
         # Parse and validate response
-        return self._parse_llm_response(llm_response, base_risk_score)
+        return self._parse_llm_response(verdict, base_risk_score)
+    
+    @staticmethod
+    def is_cacheable(verdict: Optional[Dict]) -> bool:
+        """Whether a raw verdict is a real LLM answer (not a missing LLM or a failed call)"""
+        return verdict is not None and not verdict.get('error')
+    
+    def analyze_batch(self, rows: List[LLMRow]) -> List[Dict]:
+        """
+        Perform LLM-based analysis for several wallets with one call per chunk
+        
+        Args:
+            rows: List of (wallet_signals, protocol_health, market_volatility,
+                base_risk_score) tuples
+            
+        Returns:
+            List of result dictionaries, in the same order as ``rows``
+        """
+        return [self.finalize(verdict, row[3]) for verdict, row in zip(self.verdict_batch(rows), rows)]
+    
+    def verdict_batch(self, rows: List[LLMRow]) -> List[Optional[Dict]]:
+        """
+        Raw LLM verdicts for several wallets with one call per chunk
+        
+        Wallets are marshaled into a single numbered prompt (up to
+        ``max_rows_per_request`` per call) so the shared instructions and the
+        HTTP round-trip are paid once per chunk instead of once per wallet.
+        Rows missing from (or malformed in) a chunk's response are retried
+        with per-row calls; the valid rows of that chunk are kept. A chunk
+        whose call failed outright gives every row the error verdict.
+        
+        Returns:
+            List of raw verdicts (None without an LLM), in the same order as ``rows``
+        """
+        if not self._llm_available:
+            return [None] * len(rows)
+        
+        verdicts: List[Optional[Dict]] = []
+        step = self.max_rows_per_request
+        for start in range(0, len(rows), step):
+            chunk = rows[start:start + step]
+            if len(chunk) == 1:
+                verdicts.append(self.verdict(*chunk[0]))
+                continue
+            
+            llm_response = self._call_llm(self._build_batch_prompt(chunk))
+            if llm_response.get('error'):
+                # The call already exhausted its retries; per-row calls would
+                # only hammer the same failing API
+                verdicts.extend([llm_response] * len(chunk))
+                continue
+            
+            by_idx = self._validate_batch_response(llm_response, len(chunk))
+            
+            # Only the rows the batched response didn't cover are retried on their own
+            verdicts.extend(
+                by_idx[idx] if idx in by_idx else self.verdict(*row)
+                for idx, row in enumerate(chunk)
+            )
+        
+        return verdicts
+    
+    async def analyze_async(
+        self,
+        wallet_signals: WalletSignals,
+        protocol_health: ProtocolHealthIndicators,
+        market_volatility: MarketVolatilityFlags,
+        base_risk_score: float
+    ) -> Dict:
+        """
+        Async variant of analyze() using the non-blocking OpenAI client
+        
+        Calls are throttled by the request/token rate limiter and retried
+        with exponential backoff on rate-limit and server errors.
+        """
+        verdict = await self.verdict_async(wallet_signals, protocol_health, market_volatility, base_risk_score)
+        return self.finalize(verdict, base_risk_score)
+    
+    async def verdict_async(
+        self,
+        wallet_signals: WalletSignals,
+        protocol_health: ProtocolHealthIndicators,
+        market_volatility: MarketVolatilityFlags,
+        base_risk_score: float
+    ) -> Optional[Dict]:
+        """Async variant of verdict()"""
+        if not self._llm_available:
+            return None
+        
+        prompt = self._build_prompt(
+            wallet_signals,
+            protocol_health,
+            market_volatility,
+            base_risk_score
+        )
+        return await self._call_llm_async(prompt)
+    
+    async def analyze_many_async(self, rows: List[LLMRow], max_concurrent: int = 10) -> List[Dict]:
+        """
+        Analyze several wallets with up to ``max_concurrent`` requests in flight
+        
+        Args:
+            rows: List of (wallet_signals, protocol_health, market_volatility,
+                base_risk_score) tuples
+            max_concurrent: Max simultaneous LLM requests
+            
+        Returns:
+            List of result dictionaries, in the same order as ``rows``
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        
+        async def run(row: LLMRow) -> Dict:
+            async with semaphore:
+                return await self.analyze_async(*row)
+        
+        return list(await asyncio.gather(*(run(row) for row in rows)))
+    
+    def _require_llm(self) -> None:
+        """Guard prompt building: rule-only mode must never format prompts"""
+        if not self._llm_available:
+            raise RuntimeError("LLM is disabled (no API key); prompts must not be built")
     
     def _build_prompt(
         self,
@@ -75,6 +386,31 @@ class LLMReasoning:
         base_score: float
     ) -> str:
         """Build comprehensive prompt for LLM analysis"""
+        self._require_llm()
+        return _PROMPT_HEAD + self._build_wallet_section(signals, protocol, market, base_score) + _PROMPT_TAIL
+    
+    def _build_batch_prompt(self, rows: List[LLMRow]) -> str:
+        """Build a single prompt covering several wallets, numbered by idx"""
+        self._require_llm()
+        
+        parts = [_BATCH_PROMPT_HEAD.format(count=len(rows))]
+        for idx, (signals, protocol, market, base_score) in enumerate(rows):
+            if idx:
+                parts.append("\n\n")
+            parts.append(f"# Wallet {idx}\n\n")
+            parts.append(self._build_wallet_section(signals, protocol, market, base_score))
+        parts.append(_BATCH_PROMPT_TAIL)
+        
+        return "".join(parts)
+    
+    def _build_wallet_section(
+        self,
+        signals: WalletSignals,
+        protocol: ProtocolHealthIndicators,
+        market: MarketVolatilityFlags,
+        base_score: float
+    ) -> str:
+        """Build the per-wallet body of the prompt (everything but the instructions)"""
         
         # Identify positive and negative signals
         positive_signals = []
@@ -87,74 +423,30 @@ class LLMReasoning:
         if signals.on_chain_reputation and signals.on_chain_reputation > 70:
             positive_signals.append(f"On-chain reputation: {signals.on_chain_reputation}/100")
         
-        negative_signals = []
-        if signals.suspicious_patterns.mixer_interaction:
-            negative_signals.append("Tornado Cash / mixer interaction detected")
-        if signals.suspicious_patterns.rapid_draining:
-            negative_signals.append("Rapid asset drainage pattern")
-        if signals.suspicious_patterns.unusual_activity:
-            negative_signals.append("Unusual transaction activity spike")
-        if signals.suspicious_patterns.new_wallet_high_value:
-            negative_signals.append("New wallet with unusually high value")
-        
-        # Build context
-        context_description = self._build_context_description(signals, protocol, market)
+        suspicious = signals.suspicious_patterns.flags
+        negative_signals = [text for bit, text in _NEGATIVE_SIGNAL_TEXT if suspicious & bit]
         
-        prompt = f"""You are an expert DeFi risk analyst. Analyze the following wallet situation and provide a nuanced assessment.
-
-## Wallet Context
-Address Hash: {signals.wallet_address[:10]}...
-Age: {signals.age_in_days} days
-Balance: ${signals.current_balance.total_usd:,.2f}
-Transaction History: {signals.total_transactions} transactions
-
-## Risk Signals
-- Positive Indicators: {', '.join(positive_signals) if positive_signals else 'None'}
-- Negative Indicators: {', '.join(negative_signals) if negative_signals else 'None'}
-
-## Current Situation
-{context_description}
-
-## Market Context
-Volatility Index: {market.volatility_index}/100
-Market Sentiment: {market.market_sentiment}
-Flash Crash: {'Yes' if market.flash_crash_detected else 'No'}
-
-## Protocol Health
-TVL: ${protocol.total_value_locked:,.2f}
-Default Rate: {protocol.default_rate}%
-Recent Liquidations (24h): {protocol.liquidation_events_24h}
-
-## Rule-Based Risk Score
-{base_score:.1f}/100
-
-## Your Task
-1. Assess the TRUE risk level (0-100)
-2. Determine if this is:
-   - Legitimate user exhibiting normal behavior
-   - Privacy-focused user (not malicious)
-   - High-risk borrower
-   - Potential threat/Sybil attack
-   - Victim of compromise
-
-3. Recommend ONE of:
-   - NO_ACTION (safe, continue normal operations)
-   - MONITOR (elevated risk, watch closely)
-   - REQUEST_SEVERITY_ANALYSIS (need more data)
-   - ENFORCE_ACTION (immediate protective action)
-
-4. Provide clear reasoning in 2-3 sentences
-
-## Response Format (JSON only, no other text):
-{{
-  "risk_score": <number 0-100>,
-  "classification": "<type>",
-  "decision": "<NO_ACTION|MONITOR|REQUEST_SEVERITY_ANALYSIS|ENFORCE_ACTION>",
-  "reasoning": "<explanation>",
-  "confidence": <number 0-100>
-}}"""
+        balance = signals.current_balance.total_usd
         
-        return prompt
+        return "".join([
+            "## Wallet Context\nAddress Hash: ", signals.wallet_address[:10],
+            "...\nAge: ", str(signals.age_in_days),
+            " days\nBalance: ", f"${balance:,.2f}" if balance else "$0.00",
+            "\nTransaction History: ", str(signals.total_transactions),
+            " transactions\n\n## Risk Signals\n- Positive Indicators: ",
+            ", ".join(positive_signals) if positive_signals else "None",
+            "\n- Negative Indicators: ",
+            ", ".join(negative_signals) if negative_signals else "None",
+            "\n\n## Current Situation\n",
+            self._build_context_description(signals, protocol, market),
+            "\n\n## Market Context\nVolatility Index: ", str(market.volatility_index),
+            "/100\nMarket Sentiment: ", str(market.market_sentiment),
+            "\nFlash Crash: ", "Yes" if market.flash_crash_detected else "No",
+            "\n\n## Protocol Health\nTVL: ", f"${protocol.total_value_locked:,.2f}",
+            "\nDefault Rate: ", str(protocol.default_rate),
+            "%\nRecent Liquidations (24h): ", str(protocol.liquidation_events_24h),
+            "\n\n## Rule-Based Risk Score\n", f"{base_score:.1f}", "/100",
+        ])
     
     def _build_context_description(
         self,
@@ -188,36 +480,115 @@ Recent Liquidations (24h): {protocol.liquidation_events_24h}
         - OpenAI GPT-4
         - Anthropic Claude
         - Open-source models via API
+        
+        Rate-limit, server and connection errors are retried with jittered
+        exponential backoff; authentication errors are raised immediately.
         """
-        if self.api_key:
-            client = openai.OpenAI(api_key=self.api_key)
+        client = self.client
+        if client is not None:
+            for attempt in range(_MAX_ATTEMPTS):
+                try:
+                    response = client.chat.completions.create(
+                        model=self.model,
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=0.1,
+                        response_format={"type": "json_object"}
+                    )
+                    return orjson.loads(response.choices[0].message.content)
+                except _RETRYABLE_ERRORS as e:
+                    if attempt == _MAX_ATTEMPTS - 1:
+                        return self._error_response(e)
+                    time.sleep(_backoff_delay(attempt))
+                except openai.AuthenticationError:
+                    raise
+                except Exception as e:
+                    # Fallback to mock if API fails
+                    return self._error_response(e)
+        
+        return {
+            "risk_score": 65,
+            "classification": "Privacy-focused user",
+            "decision": "MONITOR",
+            "reasoning": "Wallet shows mixer interaction but also has strong reputation signals (ENS, Gitcoin). Likely a privacy-conscious user rather than malicious actor. Recommend monitoring rather than immediate action.",
+            "confidence": 75
+        }
+    
+    async def _call_llm_async(self, prompt: str) -> Dict:
+        """Call the LLM API without blocking the event loop"""
+        # A client from an earlier (now closed) loop can't be reused here
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            self._async_client = openai.AsyncOpenAI(api_key=self.api_key)
+            self._async_client_loop = loop
+        client = self._async_client
+        
+        tokens = len(prompt) // 4 + _COMPLETION_TOKENS_ESTIMATE
+        for attempt in range(_MAX_ATTEMPTS):
+            # Every attempt, retries included, counts against the quota
+            await self._rate_limiter.acquire(tokens)
             try:
-                response = client.chat.completions.create(
+                response = await client.chat.completions.create(
                     model=self.model,
                     messages=[{"role": "user", "content": prompt}],
                     temperature=0.1,
                     response_format={"type": "json_object"}
                 )
-                return json.loads(response.choices[0].message.content)
+                return orjson.loads(response.choices[0].message.content)
+            except _RETRYABLE_ERRORS as e:
+                if attempt == _MAX_ATTEMPTS - 1:
+                    return self._error_response(e)
+                await asyncio.sleep(_backoff_delay(attempt))
+            except openai.AuthenticationError:
+                raise
             except Exception as e:
-                print(f"LLM Error: {e}")
-                # Fallback to mock if API fails
-                return {
-                    "risk_score": 65,
-                    "classification": "Error fallback",
-                    "decision": "MONITOR",
-                    "reasoning": f"LLM analysis failed: {str(e)}. Defaulting to monitor.",
-                    "confidence": 50
-                }
-        
+                return self._error_response(e)
+    
+    def _error_response(self, error: Exception) -> Dict:
+        """Canned MONITOR response used when the LLM call fails"""
+        logger.warning("LLM error: %s", error)
         return {
             "risk_score": 65,
-            "classification": "Privacy-focused user",
-            "decision": "MONITOR",
-            "reasoning": "Wallet shows mixer interaction but also has strong reputation signals (ENS, Gitcoin). Likely a privacy-conscious user rather than malicious actor. Recommend monitoring rather than immediate action.",
-            "confidence": 75
+            "classification": "Error fallback",
+            "decision": Decision.MONITOR,
+            "reasoning": f"LLM analysis failed: {str(error)}. Defaulting to monitor.",
+            "confidence": 50,
+            "error": True
         }
     
+    def _validate_batch_response(self, llm_response: Dict, expected: int) -> Dict[int, Dict]:
+        """
+        Validate a batched LLM response and key its valid entries by idx
+        
+        An entry is valid when its idx is in 0..expected-1 and appears once,
+        with a numeric risk_score and a known decision. Wallets without a
+        valid entry are left out so the caller can retry just those.
+        """
+        entries = llm_response.get('results') if isinstance(llm_response, dict) else None
+        if not isinstance(entries, list):
+            return {}
+        
+        by_idx = {}
+        duplicates = set()
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            idx = entry.get('idx')
+            if not isinstance(idx, int) or not 0 <= idx < expected:
+                continue
+            if not isinstance(entry.get('risk_score'), (int, float)):
+                continue
+            if entry.get('decision') not in _VALID_DECISIONS:
+                continue
+            if idx in by_idx:
+                duplicates.add(idx)
+            by_idx[idx] = entry
+        
+        # An idx answered twice is ambiguous - retry it
+        for idx in duplicates:
+            del by_idx[idx]
+        
+        return by_idx
+    
     def _parse_llm_response(self, llm_response: Dict, base_score: float) -> Dict:
         """
         Parse and validate LLM response
@@ -226,13 +597,17 @@ Recent Liquidations (24h): {protocol.liquidation_events_24h}
         """
         # Extract fields
         llm_risk_score = float(llm_response.get('risk_score', base_score))
-        decision = llm_response.get('decision', 'MONITOR')
+        # Untrusted value: anything but a known decision string becomes MONITOR
+        decision = llm_response.get('decision')
+        decision = STR_TO_DECISION.get(decision) if isinstance(decision, str) else None
+        if decision is None:
+            decision = Decision.MONITOR
         reasoning = llm_response.get('reasoning', '')
         confidence = float(llm_response.get('confidence', 50))
         
         # Safety override: Never downgrade ENFORCE_ACTION if base score is critical
-        if base_score > 85 and decision != 'ENFORCE_ACTION':
-            decision = 'ENFORCE_ACTION'
+        if base_score > 85 and decision != Decision.ENFORCE_ACTION:
+            decision = Decision.ENFORCE_ACTION
             reasoning += " [OVERRIDE: Critical risk detected by rule-based engine]"
             confidence = min(confidence, 70)  # Lower confidence due to override
         
@@ -246,27 +621,3 @@ Recent Liquidations (24h): {protocol.liquidation_events_24h}
             'confidence': confidence,
             'classification': llm_response.get('classification', 'Unknown')
         }
-    
-    def _fallback_analysis(self, base_risk_score: float) -> Dict:
-        """
-        Fallback analysis when LLM is unavailable
-        
-        Uses conservative decision-making based on risk score
-        """
-        if base_risk_score >= 75:
-            decision = 'ENFORCE_ACTION'
-            reasoning = "High risk score detected. LLM unavailable - using conservative approach."
-        elif base_risk_score >= 50:
-            decision = 'MONITOR'
-            reasoning = "Elevated risk. LLM unavailable - defaulting to monitoring."
-        else:
-            decision = 'NO_ACTION'
-            reasoning = "Risk within acceptable range."
-        
-        return {
-            'risk_score': base_risk_score,
-            'decision': decision,
-            'reasoning': reasoning,
-            'confidence': 60,  # Lower confidence without LLM
-            'classification': 'Automated fallback'
-        }
@@ -5,15 +5,18 @@ This module defines all input and output schemas for the wallet analysis system.
 """
 
 from dataclasses import dataclass, field
+from enum import Enum, IntFlag
 from typing import List, Dict, Optional, Literal
 from datetime import datetime
 
+import orjson
+
 
 # ============================================================================
 # INPUT SCHEMAS
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TransactionVelocity:
     """Transaction activity over different time windows"""
     last_24h: int
@@ -21,7 +24,7 @@ class TransactionVelocity:
     last_30d: int
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CurrentBalance:
     """Current wallet balances"""
     native: float  # ETH, MATIC, etc.
@@ -29,7 +32,7 @@ class CurrentBalance:
     total_usd: float
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PortfolioValue:
     """Total portfolio breakdown"""
     tokens: float
@@ -38,7 +41,17 @@ class PortfolioValue:
     total_usd: float
 
 
-@dataclass
+class SuspicionFlag(IntFlag):
+    """Bit positions of the packed SuspiciousPatterns bitmask"""
+    NONE = 0
+    MIXER = 1
+    RAPID_DRAINING = 2
+    UNUSUAL = 4
+    NEW_HIGH_VALUE = 8
+    SANCTIONED = 16
+
+
+@dataclass(slots=True, frozen=True)
 class SuspiciousPatterns:
     """Detected suspicious behavior flags"""
     rapid_draining: bool = False
@@ -46,9 +59,25 @@ class SuspiciousPatterns:
     new_wallet_high_value: bool = False
     mixer_interaction: bool = False
     sanctioned_address_interaction: bool = False
+    
+    # Packed SuspicionFlag bits, computed once so hot paths test a single int
+    flags: int = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, 'flags', int(
+            (SuspicionFlag.MIXER if self.mixer_interaction else 0) |
+            (SuspicionFlag.RAPID_DRAINING if self.rapid_draining else 0) |
+            (SuspicionFlag.UNUSUAL if self.unusual_activity else 0) |
+            (SuspicionFlag.NEW_HIGH_VALUE if self.new_wallet_high_value else 0) |
+            (SuspicionFlag.SANCTIONED if self.sanctioned_address_interaction else 0)
+        ))
+    
+    def to_mask(self) -> int:
+        """Packed SuspicionFlag bitmask (0-31)"""
+        return self.flags
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DeFiProtocol:
     """DeFi protocol interaction data"""
     protocol_name: str
@@ -57,7 +86,7 @@ class DeFiProtocol:
     last_interaction: int
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LendingBorrowing:
     """Lending/borrowing position data"""
     total_borrowed: float
@@ -65,7 +94,7 @@ class LendingBorrowing:
     health_factor: float  # <1.0 = liquidation risk
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class WalletSignals:
     """Comprehensive wallet behavior signals"""
     # Identity & Age
@@ -101,9 +130,14 @@ class WalletSignals:
     ens_name: Optional[str] = None
     has_poap: bool = False
     has_gitcoin_passport: bool = False
+    
+    @property
+    def suspicious_flags(self) -> int:
+        """Packed SuspicionFlag bitmask of suspicious_patterns"""
+        return self.suspicious_patterns.flags
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LiquidityDepth:
     """Protocol liquidity tiers"""
     tier1: float  # Immediate liquidity
@@ -111,7 +145,7 @@ class LiquidityDepth:
     tier3: float  # 24-hour liquidity
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PegStability:
     """Stablecoin peg stability"""
     asset: str
@@ -120,7 +154,7 @@ class PegStability:
     deviation: float  # %
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RecentUpgrade:
     """Smart contract upgrade info"""
     contract: str
@@ -128,7 +162,7 @@ class RecentUpgrade:
     audited: bool
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ProtocolHealthIndicators:
     """System-wide protocol health metrics"""
     # System-wide Metrics
@@ -156,7 +190,7 @@ class ProtocolHealthIndicators:
     recent_upgrades: List[RecentUpgrade] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AssetVolatility:
     """Asset-specific volatility metrics"""
     asset: str
@@ -167,7 +201,7 @@ class AssetVolatility:
     volume_change: float  # % vs avg
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class GasPrice:
     """Network gas price metrics"""
     current: float
@@ -179,7 +213,7 @@ MarketSentiment = Literal['EXTREME_FEAR', 'FEAR', 'NEUTRAL', 'GREED', 'EXTREME_G
 NetworkCongestion = Literal['LOW', 'MEDIUM', 'HIGH', 'EXTREME']
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MarketVolatilityFlags:
     """Market conditions and volatility indicators"""
     # Global Market Conditions
@@ -207,7 +241,7 @@ RequestType = Literal['NEW_LOAN', 'POSITION_REVIEW', 'SCHEDULED_CHECK', 'MANUAL_
 Urgency = Literal['LOW', 'MEDIUM', 'HIGH']
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RequestMetadata:
     """Request context metadata"""
     request_id: str
@@ -217,7 +251,7 @@ class RequestMetadata:
     urgency: Urgency = 'MEDIUM'
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AgentInput:
     """Complete input to the agent decision engine"""
     wallet_signals: WalletSignals
@@ -233,19 +267,40 @@ class AgentInput:
 DecisionType = Literal['NO_ACTION', 'MONITOR', 'REQUEST_SEVERITY_ANALYSIS', 'ENFORCE_ACTION']
 
 
-@dataclass
+class Decision(str, Enum):
+    """
+    DecisionType values as singletons
+    
+    Members are str subclasses, so they still equal the plain strings, but
+    comparing two members short-circuits on identity.
+    """
+    NO_ACTION = 'NO_ACTION'
+    MONITOR = 'MONITOR'
+    REQUEST_SEVERITY_ANALYSIS = 'REQUEST_SEVERITY_ANALYSIS'
+    ENFORCE_ACTION = 'ENFORCE_ACTION'
+    
+    def __str__(self) -> str:
+        return self.value
+
+
+# Map decision strings (e.g. from LLM JSON) to their Decision singleton
+STR_TO_DECISION: Dict[str, Decision] = {decision.value: decision for decision in Decision}
+
+
+@dataclass(slots=True)
 class OutputMetadata:
     """Metadata about the decision process"""
     processing_time_ms: float
     llm_used: bool
     rule_based_score: float
     llm_score: Optional[float] = None
+    partial: bool = False  # rule-based placeholder while the LLM result is pending
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentOutput:
     """Output from the agent decision engine"""
-    decision: DecisionType
+    decision: Decision
     confidence: float  # 0-100
     reasoning: str
     risk_score: float  # 0-100
@@ -257,7 +312,7 @@ class AgentOutput:
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON serialization"""
         return {
-            'decision': self.decision,
+            'decision': str(self.decision),
             'confidence': round(self.confidence, 2),
             'reasoning': self.reasoning,
             'risk_score': round(self.risk_score, 2),
@@ -268,6 +323,11 @@ class AgentOutput:
                 'processing_time_ms': round(self.metadata.processing_time_ms, 2),
                 'llm_used': self.metadata.llm_used,
                 'rule_based_score': round(self.metadata.rule_based_score, 2),
-                'llm_score': round(self.metadata.llm_score, 2) if self.metadata.llm_score else None
+                'llm_score': round(self.metadata.llm_score, 2) if self.metadata.llm_score else None,
+                'partial': self.metadata.partial
             }
         }
+    
+    def to_json_bytes(self) -> bytes:
+        """Serialize to_dict() straight to UTF-8 JSON bytes"""
+        return orjson.dumps(self.to_dict())
@@ -4,11 +4,122 @@ Main Agent Orchestrator
 Coordinates rule-based and LLM reasoning to produce final decisions.
 """
 
+import asyncio
 import time
-from typing import Optional
-from .models import AgentInput, AgentOutput, OutputMetadata, DecisionType
-from .rules import RuleBasedEngine
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Tuple
+from .models import AgentInput, AgentOutput, OutputMetadata, Decision, SuspicionFlag
+from .rules import DECISIONS, RuleBasedEngine
 from .llm_reasoning import LLMReasoning
+from .cache import ResultCache, input_fingerprint, ttl_for_market
+from .batch import WalletBatch, REQUEST_SEVERITY_ANALYSIS, evaluate_batch
+
+
+_RAPID_DRAINING = int(SuspicionFlag.RAPID_DRAINING)
+_MIXER = int(SuspicionFlag.MIXER)
+_UNUSUAL = int(SuspicionFlag.UNUSUAL)
+_SANCTIONED = int(SuspicionFlag.SANCTIONED)
+
+
+def _health_factor(agent_input: AgentInput) -> float:
+    """Health factor of the lending position (infinite when there is none)"""
+    lb = agent_input.wallet_signals.lending_borrowing
+    return lb.health_factor if lb else float('inf')
+
+
+# (predicate, flag) pairs evaluated in order by _extract_flags, before the market flags
+_FLAG_RULES: Tuple[Tuple[Callable[[AgentInput], bool], str], ...] = (
+    # Wallet age flags
+    (lambda i: i.wallet_signals.age_in_days < 7, "VERY_NEW_WALLET"),
+    (lambda i: 7 <= i.wallet_signals.age_in_days < 30, "NEW_WALLET"),
+    
+    # Suspicious pattern flags
+    (lambda i: i.wallet_signals.suspicious_patterns.flags & _RAPID_DRAINING, "RAPID_DRAINAGE"),
+    (lambda i: i.wallet_signals.suspicious_patterns.flags & _MIXER, "MIXER_INTERACTION"),
+    (lambda i: i.wallet_signals.suspicious_patterns.flags & _UNUSUAL, "UNUSUAL_ACTIVITY"),
+    (lambda i: i.wallet_signals.suspicious_patterns.flags & _SANCTIONED, "SANCTIONED_ADDRESS"),
+    
+    # DeFi health flags
+    (lambda i: _health_factor(i) < 1.1, "CRITICAL_HEALTH_FACTOR"),
+    (lambda i: 1.1 <= _health_factor(i) < 1.3, "LOW_HEALTH_FACTOR"),
+    (lambda i: 1.3 <= _health_factor(i) < 1.5, "DECLINING_HEALTH_FACTOR"),
+)
+
+# Flags emitted after the market flags (see _DerivedMarket)
+_REPUTATION_FLAG_RULES: Tuple[Tuple[Callable[[AgentInput], bool], str], ...] = (
+    (lambda i: i.wallet_signals.has_gitcoin_passport, "GITCOIN_VERIFIED"),
+    (lambda i: i.wallet_signals.ens_name, "HAS_ENS"),
+)
+
+# (predicate, formatter) pairs for the rule-based reasoning, before the market/protocol context
+_RISK_REASONING_RULES: Tuple[Tuple[Callable[[AgentInput], bool], Callable[[AgentInput], str]], ...] = (
+    # Key risk factors
+    (lambda i: i.wallet_signals.age_in_days < 30,
+     lambda i: f"New wallet ({i.wallet_signals.age_in_days} days old)."),
+    (lambda i: _health_factor(i) < 1.5,
+     lambda i: f"Health factor {_health_factor(i):.2f} - liquidation risk."),
+    (lambda i: i.wallet_signals.suspicious_patterns.flags & _RAPID_DRAINING,
+     lambda i: "Rapid asset drainage detected."),
+    (lambda i: i.wallet_signals.suspicious_patterns.flags & _MIXER,
+     lambda i: "Privacy mixer interaction found."),
+)
+
+# Reasoning emitted after the market/protocol context (see _DerivedMarket)
+_POSITIVE_REASONING_RULES: Tuple[Tuple[Callable[[AgentInput], bool], Callable[[AgentInput], str]], ...] = (
+    (lambda i: i.wallet_signals.has_gitcoin_passport,
+     lambda i: "Gitcoin Passport verified."),
+    (lambda i: i.wallet_signals.ens_name,
+     lambda i: f"ENS: {i.wallet_signals.ens_name}."),
+)
+
+
+@dataclass(slots=True)
+class _DerivedMarket:
+    """
+    Market and protocol context shared by every wallet analyzed against the
+    same snapshot, with its reasoning fragments and flags formatted once
+    """
+    reasoning: Tuple[str, ...]
+    flags: Tuple[str, ...]
+    
+    @classmethod
+    def from_input(cls, agent_input: AgentInput) -> '_DerivedMarket':
+        market = agent_input.market_volatility
+        protocol = agent_input.protocol_health
+        high_volatility = market.volatility_index > 70
+        
+        reasoning = []
+        if high_volatility:
+            reasoning.append(f"High market volatility ({market.volatility_index}/100).")
+        if protocol.default_rate > 5.0:
+            reasoning.append(f"Elevated protocol default rate ({protocol.default_rate}%).")
+        
+        flags = []
+        if high_volatility:
+            flags.append("HIGH_MARKET_VOLATILITY")
+        if market.flash_crash_detected:
+            flags.append("FLASH_CRASH_ACTIVE")
+        
+        return cls(tuple(reasoning), tuple(flags))
+
+
+def _derive_markets(inputs: List[AgentInput]) -> List[_DerivedMarket]:
+    """Build one _DerivedMarket per distinct (market, protocol) pair in a batch"""
+    derived: Dict[Tuple[int, int], _DerivedMarket] = {}
+    result = []
+    for agent_input in inputs:
+        key = (id(agent_input.market_volatility), id(agent_input.protocol_health))
+        if key not in derived:
+            derived[key] = _DerivedMarket.from_input(agent_input)
+        result.append(derived[key])
+    return result
+
+
+class _RulePhase(NamedTuple):
+    """Outcome of the rule-based phase for one wallet"""
+    risk_score: float
+    decision: Decision
+    needs_llm: bool
 
 
 class AgentOrchestrator:
@@ -19,15 +130,17 @@ class AgentOrchestrator:
     to produce final risk assessments and decisions.
     """
     
-    def __init__(self, llm_api_key: Optional[str] = None):
+    def __init__(self, llm_api_key: Optional[str] = None, result_cache: Optional[ResultCache] = None):
         """
         Initialize the agent orchestrator
         
         Args:
             llm_api_key: Optional API key for LLM provider
+            result_cache: Optional cache for raw LLM verdicts (a private one is created if omitted)
         """
         self.rule_engine = RuleBasedEngine()
         self.llm_reasoning = LLMReasoning(api_key=llm_api_key)
+        self.result_cache = result_cache if result_cache is not None else ResultCache()
     
     def analyze(self, agent_input: AgentInput) -> AgentOutput:
         """
@@ -42,6 +155,187 @@ class AgentOrchestrator:
         start_time = time.time()
         
         # Phase 1: Rule-based analysis
+        phase1 = self._rule_based_phase(agent_input)
+        risk_score = phase1.risk_score
+        
+        # Phase 2: LLM analysis (if needed)
+        llm_result = None
+        if phase1.needs_llm:
+            # Identical snapshots re-use the previous raw LLM verdict
+            cache_key = input_fingerprint(agent_input)
+            verdict = self.result_cache.get(cache_key)
+            
+            if verdict is None:
+                verdict = self.llm_reasoning.verdict(
+                    agent_input.wallet_signals,
+                    agent_input.protocol_health,
+                    agent_input.market_volatility,
+                    risk_score
+                )
+                self._cache_verdict(cache_key, agent_input, verdict)
+            
+            llm_result = self.llm_reasoning.finalize(verdict, risk_score)
+        
+        return self._build_output(agent_input, start_time, phase1, llm_result)
+    
+    def analyze_many(self, inputs: List[AgentInput]) -> List[AgentOutput]:
+        """
+        Analyze several wallets, grouping every row that needs the LLM into
+        batched LLM calls instead of one call per wallet
+        
+        Args:
+            inputs: List of complete input data
+            
+        Returns:
+            List of AgentOutput, in the same order as ``inputs``
+        """
+        start_time = time.time()
+        
+        # Phase 1: Rule-based analysis for every row
+        phase1 = [self._rule_based_phase(agent_input) for agent_input in inputs]
+        
+        return self._finish_many(inputs, phase1, start_time)
+    
+    def analyze_batch(self, inputs: List[AgentInput]) -> List[AgentOutput]:
+        """
+        Analyze many wallets with vectorized rule-based scoring
+        
+        Scores, decisions and confidences for the whole batch are computed
+        over a structure-of-arrays view of the inputs (Numba-compiled when
+        available, NumPy otherwise); only rows that need the LLM go through
+        the (batched) LLM path.
+        
+        Args:
+            inputs: List of complete input data
+            
+        Returns:
+            List of AgentOutput, in the same order as ``inputs``
+        """
+        start_time = time.time()
+        
+        # Phase 1: Vectorized rule-based analysis
+        batch = WalletBatch.from_inputs(inputs)
+        scores, decisions, confidences = evaluate_batch(batch)
+        needs_llm = decisions == REQUEST_SEVERITY_ANALYSIS
+        
+        phase1 = [
+            _RulePhase(float(score), DECISIONS[decision], bool(llm))
+            for score, decision, llm in zip(scores, decisions, needs_llm)
+        ]
+        
+        return self._finish_many(inputs, phase1, start_time, confidences.tolist())
+    
+    def _finish_many(
+        self,
+        inputs: List[AgentInput],
+        phase1: List[_RulePhase],
+        start_time: float,
+        confidences: Optional[List[float]] = None
+    ) -> List[AgentOutput]:
+        """Run one batched LLM pass for the rows that need it, then build all outputs"""
+        derived = _derive_markets(inputs)
+        
+        # Phase 2: One batched LLM pass over the rows that need it and miss the cache
+        verdicts: Dict[int, Optional[Dict]] = {}
+        cache_keys: Dict[int, str] = {}
+        for i, row in enumerate(phase1):
+            if row.needs_llm:
+                cache_keys[i] = input_fingerprint(inputs[i])
+                cached = self.result_cache.get(cache_keys[i])
+                if cached is not None:
+                    verdicts[i] = cached
+        
+        llm_rows = [i for i in cache_keys if i not in verdicts]
+        batch_verdicts = self.llm_reasoning.verdict_batch([
+            (
+                inputs[i].wallet_signals,
+                inputs[i].protocol_health,
+                inputs[i].market_volatility,
+                phase1[i].risk_score
+            )
+            for i in llm_rows
+        ])
+        for i, verdict in zip(llm_rows, batch_verdicts):
+            self._cache_verdict(cache_keys[i], inputs[i], verdict)
+            verdicts[i] = verdict
+        
+        # Verdicts are blended with each row's own rule-based score
+        llm_results = {
+            i: self.llm_reasoning.finalize(verdict, phase1[i].risk_score)
+            for i, verdict in verdicts.items()
+        }
+        
+        return [
+            self._build_output(
+                agent_input, start_time, row, llm_results.get(i),
+                confidences[i] if confidences is not None else None,
+                derived=derived[i]
+            )
+            for i, (agent_input, row) in enumerate(zip(inputs, phase1))
+        ]
+    
+    async def analyze_stream(
+        self,
+        inputs: List[AgentInput],
+        max_concurrent: int = 10
+    ) -> AsyncIterator[Tuple[int, AgentOutput]]:
+        """
+        Analyze several wallets, yielding results as soon as they are known
+        
+        Rows that don't need the LLM (or hit the cache) are yielded right away.
+        Rows waiting on the LLM are first yielded as a rule-based output with
+        ``metadata.partial=True``, then again with the final result once the
+        async LLM call returns, in completion order.
+        
+        Args:
+            inputs: List of complete input data
+            max_concurrent: Max simultaneous LLM requests
+            
+        Yields:
+            (index into ``inputs``, AgentOutput) tuples
+        """
+        start_time = time.time()
+        semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        
+        async def run_llm(i: int, phase1: _RulePhase, cache_key: str) -> Tuple[int, _RulePhase, Dict]:
+            agent_input = inputs[i]
+            async with semaphore:
+                verdict = await self.llm_reasoning.verdict_async(
+                    agent_input.wallet_signals,
+                    agent_input.protocol_health,
+                    agent_input.market_volatility,
+                    phase1.risk_score
+                )
+            self._cache_verdict(cache_key, agent_input, verdict)
+            return i, phase1, self.llm_reasoning.finalize(verdict, phase1.risk_score)
+        
+        pending = []
+        try:
+            # Phase 1: Rule-based outputs go out immediately
+            for i, agent_input in enumerate(inputs):
+                phase1 = self._rule_based_phase(agent_input)
+                llm_result = None
+                if phase1.needs_llm:
+                    cache_key = input_fingerprint(agent_input)
+                    verdict = self.result_cache.get(cache_key)
+                    if verdict is None:
+                        pending.append(asyncio.ensure_future(run_llm(i, phase1, cache_key)))
+                        yield i, self._build_output(agent_input, start_time, phase1, None, partial=True)
+                        continue
+                    llm_result = self.llm_reasoning.finalize(verdict, phase1.risk_score)
+                
+                yield i, self._build_output(agent_input, start_time, phase1, llm_result)
+            
+            # Phase 2: Upgrade partial outputs as LLM answers land
+            for next_done in asyncio.as_completed(pending):
+                i, phase1, llm_result = await next_done
+                yield i, self._build_output(inputs[i], start_time, phase1, llm_result)
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    def _rule_based_phase(self, agent_input: AgentInput) -> _RulePhase:
+        """Run rule-based scoring and decide whether the LLM is needed"""
         risk_score = self.rule_engine.calculate_risk_score(agent_input)
         
         decision, needs_llm = self.rule_engine.map_score_to_decision(
@@ -51,20 +345,40 @@ class AgentOrchestrator:
             agent_input.market_volatility
         )
         
-        # Phase 2: LLM analysis (if needed)
+        return _RulePhase(risk_score, decision, needs_llm)
+    
+    def _cache_verdict(self, cache_key: str, agent_input: AgentInput, verdict: Optional[Dict]) -> None:
+        """
+        Remember a raw LLM verdict, expiring sooner in volatile markets
+        
+        Missing-LLM and failed-call fallbacks are never cached, so the next
+        request retries the LLM instead of replaying the fallback.
+        """
+        if self.llm_reasoning.is_cacheable(verdict):
+            self.result_cache.set(cache_key, verdict, ttl_for_market(agent_input.market_volatility))
+    
+    def _build_output(
+        self,
+        agent_input: AgentInput,
+        start_time: float,
+        phase1: _RulePhase,
+        llm_result: Optional[Dict],
+        rule_confidence: Optional[float] = None,
+        partial: bool = False,
+        derived: Optional[_DerivedMarket] = None
+    ) -> AgentOutput:
+        """Combine rule-based and (optional) LLM results into the final output"""
+        if derived is None:
+            derived = _DerivedMarket.from_input(agent_input)
+        
+        base_rule_score = risk_score = phase1.risk_score
+        decision = phase1.decision
         llm_used = False
         llm_score = None
         reasoning = ""
         confidence = 0.0
         
-        if needs_llm or decision == 'REQUEST_SEVERITY_ANALYSIS':
-            llm_result = self.llm_reasoning.analyze(
-                agent_input.wallet_signals,
-                agent_input.protocol_health,
-                agent_input.market_volatility,
-                risk_score
-            )
-            
+        if llm_result is not None:
             # Override with LLM analysis
             decision = llm_result['decision']
             risk_score = llm_result['risk_score']
@@ -77,9 +391,12 @@ class AgentOrchestrator:
             reasoning = self._generate_rule_based_reasoning(
                 decision,
                 risk_score,
-                agent_input
+                agent_input,
+                derived
             )
-            confidence = self._calculate_rule_based_confidence(risk_score)
+            if rule_confidence is None:
+                rule_confidence = self._calculate_rule_based_confidence(risk_score)
+            confidence = rule_confidence
         
         # Generate recommendations
         recommendations = self._generate_recommendations(
@@ -89,7 +406,7 @@ class AgentOrchestrator:
         )
         
         # Extract flags
-        flags = self._extract_flags(agent_input, risk_score)
+        flags = self._extract_flags(agent_input, risk_score, derived)
         
         # Calculate processing time
         processing_time = (time.time() - start_time) * 1000  # ms
@@ -98,8 +415,9 @@ class AgentOrchestrator:
         metadata = OutputMetadata(
             processing_time_ms=processing_time,
             llm_used=llm_used,
-            rule_based_score=risk_score if not llm_used else self.rule_engine.calculate_risk_score(agent_input),
-            llm_score=llm_score
+            rule_based_score=base_rule_score,
+            llm_score=llm_score,
+            partial=partial
         )
         
         return AgentOutput(
@@ -115,49 +433,24 @@ class AgentOrchestrator:
     
     def _generate_rule_based_reasoning(
         self,
-        decision: DecisionType,
+        decision: Decision,
         risk_score: float,
-        agent_input: AgentInput
+        agent_input: AgentInput,
+        derived: Optional[_DerivedMarket] = None
     ) -> str:
         """Generate human-readable reasoning for rule-based decisions"""
-        signals = agent_input.wallet_signals
-        protocol = agent_input.protocol_health
-        market = agent_input.market_volatility
-        
-        parts = []
-        
-        # Decision header
-        parts.append(f"Risk Score: {risk_score:.1f}/100. ")
-        
-        # Key risk factors
-        if signals.age_in_days < 30:
-            parts.append(f"New wallet ({signals.age_in_days} days old). ")
-        
-        if signals.lending_borrowing and signals.lending_borrowing.health_factor < 1.5:
-            parts.append(f"Health factor {signals.lending_borrowing.health_factor:.2f} - liquidation risk. ")
-        
-        if signals.suspicious_patterns.rapid_draining:
-            parts.append("Rapid asset drainage detected. ")
-        
-        if signals.suspicious_patterns.mixer_interaction:
-            parts.append("Privacy mixer interaction found. ")
-        
-        # Market context
-        if market.volatility_index > 70:
-            parts.append(f"High market volatility ({market.volatility_index}/100). ")
-        
-        # Protocol context
-        if protocol.default_rate > 5.0:
-            parts.append(f"Elevated protocol default rate ({protocol.default_rate}%). ")
-        
-        # Positive factors
-        if signals.has_gitcoin_passport:
-            parts.append("Gitcoin Passport verified. ")
-        
-        if signals.ens_name:
-            parts.append(f"ENS: {signals.ens_name}. ")
-        
-        return "".join(parts).strip()
+        if derived is None:
+            derived = _DerivedMarket.from_input(agent_input)
+        
+        # Decision header, then only the factors that apply
+        header = f"Risk Score: {risk_score:.1f}/100."
+        
+        factors = [fmt(agent_input) for pred, fmt in _RISK_REASONING_RULES if pred(agent_input)]
+        factors.extend(derived.reasoning)
+        factors.extend(fmt(agent_input) for pred, fmt in _POSITIVE_REASONING_RULES if pred(agent_input))
+        if not factors:
+            return header
+        return f"{header} {' '.join(factors)}"
     
     def _calculate_rule_based_confidence(self, risk_score: float) -> float:
         """Calculate confidence for rule-based decisions"""
@@ -175,7 +468,7 @@ class AgentOrchestrator:
     
     def _generate_recommendations(
         self,
-        decision: DecisionType,
+        decision: Decision,
         risk_score: float,
         agent_input: AgentInput
     ) -> list:
@@ -183,12 +476,12 @@ class AgentOrchestrator:
         recommendations = []
         signals = agent_input.wallet_signals
         
-        if decision == 'NO_ACTION':
+        if decision == Decision.NO_ACTION:
             recommendations.append("Continue normal monitoring")
             if signals.lending_borrowing and signals.lending_borrowing.health_factor < 2.0:
                 recommendations.append("Monitor health factor - currently safe but could improve")
         
-        elif decision == 'MONITOR':
+        elif decision == Decision.MONITOR:
             recommendations.append("Increase monitoring frequency to hourly")
             
             if signals.lending_borrowing and signals.lending_borrowing.health_factor < 1.5:
@@ -199,14 +492,14 @@ class AgentOrchestrator:
             
             recommendations.append("Review again in 24 hours")
         
-        elif decision == 'REQUEST_SEVERITY_ANALYSIS':
+        elif decision == Decision.REQUEST_SEVERITY_ANALYSIS:
             recommendations.append("Escalate to human review or advanced LLM analysis")
             recommendations.append("Gather additional context on flagged behaviors")
             
             if signals.suspicious_patterns.mixer_interaction:
                 recommendations.append("Investigate mixer usage - potentially legitimate privacy concern")
         
-        elif decision == 'ENFORCE_ACTION':
+        elif decision == Decision.ENFORCE_ACTION:
             recommendations.append("IMMEDIATE: Notify wallet owner")
             
             if signals.lending_borrowing and signals.lending_borrowing.health_factor < 1.2:
@@ -222,55 +515,19 @@ class AgentOrchestrator:
         
         return recommendations
     
-    def _extract_flags(self, agent_input: AgentInput, risk_score: float) -> list:
+    def _extract_flags(
+        self,
+        agent_input: AgentInput,
+        risk_score: float,
+        derived: Optional[_DerivedMarket] = None
+    ) -> list:
         """Extract relevant flags for the decision"""
-        flags = []
-        signals = agent_input.wallet_signals
-        market = agent_input.market_volatility
-        
-        # Wallet age flags
-        if signals.age_in_days < 7:
-            flags.append("VERY_NEW_WALLET")
-        elif signals.age_in_days < 30:
-            flags.append("NEW_WALLET")
-        
-        # Suspicious pattern flags
-        if signals.suspicious_patterns.rapid_draining:
-            flags.append("RAPID_DRAINAGE")
-        
-        if signals.suspicious_patterns.mixer_interaction:
-            flags.append("MIXER_INTERACTION")
-        
-        if signals.suspicious_patterns.unusual_activity:
-            flags.append("UNUSUAL_ACTIVITY")
-        
-        if signals.suspicious_patterns.sanctioned_address_interaction:
-            flags.append("SANCTIONED_ADDRESS")
-        
-        # DeFi health flags
-        if signals.lending_borrowing:
-            hf = signals.lending_borrowing.health_factor
-            if hf < 1.1:
-                flags.append("CRITICAL_HEALTH_FACTOR")
-            elif hf < 1.3:
-                flags.append("LOW_HEALTH_FACTOR")
-            elif hf < 1.5:
-                flags.append("DECLINING_HEALTH_FACTOR")
-        
-        # Market flags
-        if market.volatility_index > 70:
-            flags.append("HIGH_MARKET_VOLATILITY")
-        
-        if market.flash_crash_detected:
-            flags.append("FLASH_CRASH_ACTIVE")
-        
-        # Reputation flags
-        if signals.has_gitcoin_passport:
-            flags.append("GITCOIN_VERIFIED")
-        
-        if signals.ens_name:
-            flags.append("HAS_ENS")
+        if derived is None:
+            derived = _DerivedMarket.from_input(agent_input)
         
+        flags = [flag for pred, flag in _FLAG_RULES if pred(agent_input)]
+        flags.extend(derived.flags)
+        flags.extend(flag for pred, flag in _REPUTATION_FLAG_RULES if pred(agent_input))
         return flags
 
 
@@ -0,0 +1,85 @@
+"""
+Rate limiting for LLM API calls
+
+Keeps concurrent LLM requests under the provider's requests-per-minute and
+tokens-per-minute quotas using a rolling 60 second window.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+
+class RateLimiter:
+    """
+    Rolling-window request + token budget for async LLM dispatch
+    
+    Each acquire() reserves one request and an estimated token count; the
+    reservation is released automatically once it is older than the window.
+    """
+    
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        window_s: float = 60.0
+    ):
+        """
+        Initialize the rate limiter
+        
+        Args:
+            requests_per_minute: Max requests started per window
+            tokens_per_minute: Max (estimated) tokens consumed per window
+            window_s: Length of the rolling window in seconds
+        
+        Raises:
+            ValueError: If a quota or the window is not positive
+        """
+        if requests_per_minute < 1 or tokens_per_minute < 1:
+            raise ValueError("requests_per_minute and tokens_per_minute must be at least 1")
+        if window_s <= 0:
+            raise ValueError("window_s must be positive")
+        
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.window_s = window_s
+        self._reservations: Deque[Tuple[float, int]] = deque()
+        self._tokens_in_window = 0
+        
+        # asyncio.Lock binds to one event loop; a new one is made per loop
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def acquire(self, tokens: int) -> None:
+        """Wait until one request of ``tokens`` tokens fits in the window"""
+        # A single request larger than the whole budget can never fit
+        tokens = min(tokens, self.tokens_per_minute)
+        
+        loop = asyncio.get_running_loop()
+        if self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._expire(now)
+                
+                if (
+                    len(self._reservations) < self.requests_per_minute and
+                    self._tokens_in_window + tokens <= self.tokens_per_minute
+                ):
+                    self._reservations.append((now, tokens))
+                    self._tokens_in_window += tokens
+                    return
+                
+                # Sleep until the oldest reservation leaves the window
+                oldest = self._reservations[0][0]
+                await asyncio.sleep(max(0.0, oldest + self.window_s - now))
+    
+    def _expire(self, now: float) -> None:
+        """Drop reservations older than the window"""
+        while self._reservations and now - self._reservations[0][0] >= self.window_s:
+            _, tokens = self._reservations.popleft()
+            self._tokens_in_window -= tokens
@@ -4,20 +4,139 @@ Rule-based decision engine
 Implements fast, deterministic risk scoring and decision logic.
 """
 
-from typing import Tuple
+import math
+from bisect import bisect_left, bisect_right
+from typing import List, Tuple
+
+import numpy as np
+
+from ._kernels import (
+    NUMBA_AVAILABLE, REQUEST_SEVERITY_ANALYSIS, DECISION_BINS, DECISION_TABLE, score_wallet
+)
 from .models import (
     AgentInput, WalletSignals, ProtocolHealthIndicators, 
-    MarketVolatilityFlags, DecisionType, TransactionVelocity
+    MarketVolatilityFlags, Decision, SuspicionFlag
+)
+
+
+# Suspicious patterns that count as negative (but not critical) signals
+_NEGATIVE_SIGNAL_MASK = int(
+    SuspicionFlag.MIXER | SuspicionFlag.RAPID_DRAINING |
+    SuspicionFlag.UNUSUAL | SuspicionFlag.NEW_HIGH_VALUE
 )
 
+_SANCTIONED = int(SuspicionFlag.SANCTIONED)
+
+# Score added by each suspicious pattern
+_PATTERN_WEIGHTS = (
+    (SuspicionFlag.RAPID_DRAINING, 30.0),
+    (SuspicionFlag.MIXER, 25.0),
+    (SuspicionFlag.NEW_HIGH_VALUE, 20.0),
+    (SuspicionFlag.UNUSUAL, 15.0),
+    (SuspicionFlag.SANCTIONED, 50.0),  # Critical red flag
+)
+
+# Total suspicious-pattern score for every possible bitmask
+PATTERN_SCORES = tuple(
+    sum((weight for flag, weight in _PATTERN_WEIGHTS if mask & flag), 0.0)
+    for mask in range(1 << len(_PATTERN_WEIGHTS))
+)
+
+# The Decision each code produced by the batch kernels stands for
+DECISIONS = (Decision.NO_ACTION, Decision.MONITOR, Decision.REQUEST_SEVERITY_ANALYSIS, Decision.ENFORCE_ACTION)
+
+_DECISION_BINS = tuple(DECISION_BINS.tolist())
+
+# (decision, needs_llm) by [score band][has_positive][has_negative]
+_DECISION_TABLE = tuple(
+    tuple(
+        tuple((DECISIONS[code], code == REQUEST_SEVERITY_ANALYSIS) for code in row)
+        for row in band
+    )
+    for band in DECISION_TABLE.tolist()
+)
+
+# Threshold tables: weights[i] is the score for values between edges[i-1]
+# and edges[i]. "value < edge" tiers are looked up with _below (bisect_right),
+# "value > edge" tiers with _above (bisect_left).
+AGE_EDGES = (7, 30, 90, math.nextafter(365, math.inf))  # last tier is age > 365
+AGE_WEIGHTS = (20.0, 10.0, 5.0, 0.0, -10.0)
+
+BALANCE_EDGES = (100, 1000)
+BALANCE_WEIGHTS = (15.0, 5.0, 0.0)
+
+VELOCITY_RATIO_EDGES = (2.0, 3.0, 5.0)
+VELOCITY_RATIO_WEIGHTS = (0.0, 10.0, 15.0, 25.0)
+
+HEALTH_FACTOR_EDGES = (1.05, 1.1, 1.2, 1.5, 2.0)
+HEALTH_FACTOR_WEIGHTS = (50.0, 40.0, 30.0, 20.0, 10.0, 0.0)
+
+DEFAULT_RATE_EDGES = (5.0, 10.0)
+DEFAULT_RATE_WEIGHTS = (0.0, 15.0, 25.0)
+
+LIQUIDATION_EDGES = (10, 20)
+LIQUIDATION_WEIGHTS = (0.0, 10.0, 20.0)
+
+VOLATILITY_EDGES = (50, 70, 80)
+VOLATILITY_WEIGHTS = (0.0, 15.0, 25.0, 30.0)
+
+
+def _below(edges: Tuple[float, ...], weights: Tuple[float, ...], value: float) -> float:
+    """Weight of the first "value < edge" tier that matches"""
+    return weights[bisect_right(edges, value)]
+
+
+def _above(edges: Tuple[float, ...], weights: Tuple[float, ...], value: float) -> float:
+    """Weight of the highest "value > edge" tier that matches"""
+    return weights[bisect_left(edges, value)]
+
+
+
+def _kernel_args(agent_input: AgentInput) -> tuple:
+    """Flatten an AgentInput into the primitive arguments of score_wallet"""
+    signals = agent_input.wallet_signals
+    protocol = agent_input.protocol_health
+    market = agent_input.market_volatility
+    velocity = signals.transaction_velocity
+    lb = signals.lending_borrowing
+    
+    return (
+        signals.age_in_days,
+        float(signals.current_balance.total_usd),
+        float(signals.portfolio_value.total_usd),
+        velocity.last_24h,
+        velocity.last_30d,
+        signals.days_since_last_activity,
+        signals.suspicious_patterns.flags,
+        float(lb.health_factor) if lb else math.inf,
+        bool(signals.ens_name),
+        signals.has_gitcoin_passport,
+        signals.has_poap,
+        float(signals.on_chain_reputation or -1.0),
+        float(signals.credit_score or -1.0),
+        float(protocol.default_rate),
+        protocol.liquidation_events_24h,
+        bool(protocol.paused_contracts),
+        not protocol.oracle_freshness,
+        float(protocol.oracle_deviation),
+        float(market.volatility_index),
+        market.flash_crash_detected,
+        market.black_swan_event,
+        market.large_liquidations_in_progress,
+        market.network_congestion == 'EXTREME',
+    )
+
 
 class RuleBasedEngine:
     """
     Fast rule-based risk assessment engine
     
     Provides deterministic decisions based on predefined rules and thresholds.
+    The engine holds no state, so its helpers are static methods.
     """
     
+    __slots__ = ()
+    
     def calculate_risk_score(self, agent_input: AgentInput) -> float:
         """
         Calculate comprehensive risk score (0-100)
@@ -28,6 +147,9 @@ class RuleBasedEngine:
         Returns:
             Risk score from 0 (low risk) to 100 (high risk)
         """
+        if NUMBA_AVAILABLE:
+            return score_wallet(*_kernel_args(agent_input))
+        
         score = 0.0
         
         # Wallet Age & History (up to +/-20 points)
@@ -54,34 +176,39 @@ class RuleBasedEngine:
         # Market Volatility (up to +55 points)
         score += self._score_market_volatility(agent_input.market_volatility)
         
-        # Clamp to 0-100
-        return max(0.0, min(100.0, score))
+        # Clamp to 0-100 (inline: no builtin min/max calls)
+        return 0.0 if score < 0.0 else (100.0 if score > 100.0 else score)
     
-    def _score_wallet_age(self, signals: WalletSignals) -> float:
-        """Score based on wallet age"""
-        age = signals.age_in_days
-        
-        if age < 7:
-            return 20.0  # Very new - high risk
-        elif age < 30:
-            return 10.0  # New
-        elif age < 90:
-            return 5.0   # Moderately new
-        elif age > 365:
-            return -10.0  # Mature - low risk
-        else:
-            return 0.0
+    def calculate_risk_scores(self, inputs: List[AgentInput]) -> np.ndarray:
+        """
+        Calculate risk scores for many wallets in one vectorized pass
+        
+        Same result as calling calculate_risk_score on each input, but the
+        threshold tables are applied to whole feature columns at once.
+        
+        Args:
+            inputs: List of complete agent input data
+            
+        Returns:
+            Array of risk scores (0-100), in the same order as ``inputs``
+        """
+        from .batch import WalletBatch, score_batch
+        
+        return score_batch(WalletBatch.from_inputs(inputs))
+    
+    @staticmethod
+    def _score_wallet_age(signals: WalletSignals) -> float:
+        """Score based on wallet age (very new = high risk, mature = low risk)"""
+        return _below(AGE_EDGES, AGE_WEIGHTS, signals.age_in_days)
     
-    def _score_balance(self, signals: WalletSignals) -> float:
+    @staticmethod
+    def _score_balance(signals: WalletSignals) -> float:
         """Score based on balance and portfolio value"""
         score = 0.0
         total_balance = signals.current_balance.total_usd
         
         # Very low balance is risky
-        if total_balance < 100:
-            score += 15.0
-        elif total_balance < 1000:
-            score += 5.0
+        score += _below(BALANCE_EDGES, BALANCE_WEIGHTS, total_balance)
         
         # New wallet with high value is suspicious
         if signals.age_in_days < 30 and total_balance > 50000:
@@ -93,21 +220,20 @@ class RuleBasedEngine:
         
         return score
     
-    def _score_transaction_patterns(self, signals: WalletSignals) -> float:
+    @staticmethod
+    def _score_transaction_patterns(signals: WalletSignals) -> float:
         """Score based on transaction patterns"""
         score = 0.0
         velocity = signals.transaction_velocity
         
-        # Calculate velocity ratio (recent vs average)
-        velocity_ratio = self._calculate_velocity_ratio(velocity, signals.age_in_days)
+        # Recent 24h activity vs the 30-day daily average (1.0 without history)
+        if signals.age_in_days == 0 or velocity.last_30d == 0:
+            velocity_ratio = 1.0
+        else:
+            velocity_ratio = velocity.last_24h / (velocity.last_30d / 30.0)
         
         # Abnormal velocity spike
-        if velocity_ratio > 5.0:
-            score += 25.0
-        elif velocity_ratio > 3.0:
-            score += 15.0
-        elif velocity_ratio > 2.0:
-            score += 10.0
+        score += _above(VELOCITY_RATIO_EDGES, VELOCITY_RATIO_WEIGHTS, velocity_ratio)
         
         # Very low activity is also suspicious for active protocols
         if signals.days_since_last_activity > 90:
@@ -115,30 +241,21 @@ class RuleBasedEngine:
         
         return score
     
-    def _score_suspicious_patterns(self, signals: WalletSignals) -> float:
-        """Score based on detected suspicious patterns"""
-        score = 0.0
-        patterns = signals.suspicious_patterns
-        
-        if patterns.rapid_draining:
-            score += 30.0
-        
-        if patterns.mixer_interaction:
-            score += 25.0
-        
-        if patterns.new_wallet_high_value:
-            score += 20.0
-        
-        if patterns.unusual_activity:
-            score += 15.0
-        
-        if patterns.sanctioned_address_interaction:
-            score += 50.0  # Critical red flag
-        
-        return score
+    @staticmethod
+    def _score_suspicious_patterns(signals: WalletSignals) -> float:
+        """Score based on detected suspicious patterns (one table lookup)"""
+        return PATTERN_SCORES[signals.suspicious_patterns.to_mask()]
     
-    def _score_reputation(self, signals: WalletSignals) -> float:
+    @staticmethod
+    def _score_reputation(signals: WalletSignals) -> float:
         """Score based on reputation signals (negative values = lower risk)"""
+        # Anonymous wallets (the common case) carry none of these signals
+        if not (
+            signals.ens_name or signals.has_gitcoin_passport or signals.has_poap or
+            signals.on_chain_reputation or signals.credit_score
+        ):
+            return 0.0
+        
         score = 0.0
         
         # Positive reputation signals reduce risk
@@ -159,43 +276,25 @@ class RuleBasedEngine:
         
         return score
     
-    def _score_defi_health(self, signals: WalletSignals) -> float:
+    @staticmethod
+    def _score_defi_health(signals: WalletSignals) -> float:
         """Score based on DeFi position health"""
         if not signals.lending_borrowing:
             return 0.0
         
-        score = 0.0
-        health_factor = signals.lending_borrowing.health_factor
-        
-        # Critical liquidation risk
-        if health_factor < 1.05:
-            score += 50.0
-        elif health_factor < 1.1:
-            score += 40.0
-        elif health_factor < 1.2:
-            score += 30.0
-        elif health_factor < 1.5:
-            score += 20.0
-        elif health_factor < 2.0:
-            score += 10.0
-        
-        return score
+        # The lower the health factor, the closer to liquidation
+        return _below(HEALTH_FACTOR_EDGES, HEALTH_FACTOR_WEIGHTS, signals.lending_borrowing.health_factor)
     
-    def _score_protocol_health(self, protocol: ProtocolHealthIndicators) -> float:
+    @staticmethod
+    def _score_protocol_health(protocol: ProtocolHealthIndicators) -> float:
         """Score based on overall protocol health"""
         score = 0.0
         
         # High default rate
-        if protocol.default_rate > 10.0:
-            score += 25.0
-        elif protocol.default_rate > 5.0:
-            score += 15.0
+        score += _above(DEFAULT_RATE_EDGES, DEFAULT_RATE_WEIGHTS, protocol.default_rate)
         
         # Many recent liquidations
-        if protocol.liquidation_events_24h > 20:
-            score += 20.0
-        elif protocol.liquidation_events_24h > 10:
-            score += 10.0
+        score += _above(LIQUIDATION_EDGES, LIQUIDATION_WEIGHTS, protocol.liquidation_events_24h)
         
         # Paused contracts (emergency)
         if protocol.paused_contracts:
@@ -210,17 +309,13 @@ class RuleBasedEngine:
         
         return score
     
-    def _score_market_volatility(self, market: MarketVolatilityFlags) -> float:
+    @staticmethod
+    def _score_market_volatility(market: MarketVolatilityFlags) -> float:
         """Score based on market conditions"""
         score = 0.0
         
         # High volatility
-        if market.volatility_index > 80:
-            score += 30.0
-        elif market.volatility_index > 70:
-            score += 25.0
-        elif market.volatility_index > 50:
-            score += 15.0
+        score += _above(VOLATILITY_EDGES, VOLATILITY_WEIGHTS, market.volatility_index)
         
         # Market events
         if market.flash_crash_detected:
@@ -239,30 +334,13 @@ class RuleBasedEngine:
         
         return score
     
-    def _calculate_velocity_ratio(self, velocity: TransactionVelocity, age_days: int) -> float:
-        """Calculate recent transaction velocity vs normal rate"""
-        if age_days == 0 or velocity.last_30d == 0:
-            return 1.0
-        
-        # Average daily transactions over 30 days
-        avg_daily = velocity.last_30d / 30.0
-        
-        if avg_daily == 0:
-            return 1.0
-        
-        # Recent 24h activity compared to average
-        recent_rate = velocity.last_24h
-        ratio = recent_rate / avg_daily
-        
-        return ratio
-    
     def map_score_to_decision(
         self,
         risk_score: float,
         signals: WalletSignals,
         protocol: ProtocolHealthIndicators,
         market: MarketVolatilityFlags
-    ) -> Tuple[DecisionType, bool]:
+    ) -> Tuple[Decision, bool]:
         """
         Map risk score to decision type
         
@@ -277,55 +355,33 @@ class RuleBasedEngine:
         """
         # Critical blockers - immediate action
         if self._check_critical_blockers(signals, protocol, market):
-            return ('ENFORCE_ACTION', False)
-        
-        # Very high risk
-        if risk_score >= 80:
-            return ('ENFORCE_ACTION', False)
+            return (Decision.ENFORCE_ACTION, False)
         
-        # High risk with ambiguity
-        if risk_score >= 60:
-            # Check for conflicting signals
-            has_positive = self._has_positive_signals(signals)
-            has_negative = self._has_negative_signals(signals)
-            
-            if has_positive and has_negative:
-                # Ambiguous - needs LLM analysis
-                return ('REQUEST_SEVERITY_ANALYSIS', True)
-            else:
-                # Clear high risk
-                return ('ENFORCE_ACTION', False)
-        
-        # Medium risk
-        if risk_score >= 30:
-            return ('MONITOR', False)
-        
-        # Low risk
-        return ('NO_ACTION', False)
+        # Score band x conflicting signals; ambiguous high risk needs LLM analysis
+        band = bisect_right(_DECISION_BINS, risk_score)
+        has_positive = bool(self._has_positive_signals(signals))
+        has_negative = self._has_negative_signals(signals)
+        return _DECISION_TABLE[band][has_positive][has_negative]
     
+    @staticmethod
     def _check_critical_blockers(
-        self,
         signals: WalletSignals,
         protocol: ProtocolHealthIndicators,
         market: MarketVolatilityFlags
     ) -> bool:
         """Check for critical conditions requiring immediate action"""
-        # Sanctioned address
-        if signals.suspicious_patterns.sanctioned_address_interaction:
-            return True
-        
-        # Critical health factor during high volatility
-        if signals.lending_borrowing:
-            if signals.lending_borrowing.health_factor < 1.05 and market.volatility_index > 70:
-                return True
-        
-        # Protocol emergency
-        if protocol.paused_contracts:
-            return True
-        
-        return False
+        lb = signals.lending_borrowing
+        return bool(
+            # Sanctioned address
+            signals.suspicious_patterns.flags & _SANCTIONED or
+            # Protocol emergency
+            protocol.paused_contracts or
+            # Critical health factor during high volatility
+            (lb and lb.health_factor < 1.05 and market.volatility_index > 70)
+        )
     
-    def _has_positive_signals(self, signals: WalletSignals) -> bool:
+    @staticmethod
+    def _has_positive_signals(signals: WalletSignals) -> bool:
         """Check if wallet has positive reputation signals"""
         return (
             signals.ens_name is not None or
@@ -334,12 +390,7 @@ class RuleBasedEngine:
             (signals.on_chain_reputation and signals.on_chain_reputation > 70)
         )
     
-    def _has_negative_signals(self, signals: WalletSignals) -> bool:
+    @staticmethod
+    def _has_negative_signals(signals: WalletSignals) -> bool:
         """Check if wallet has negative risk signals"""
-        patterns = signals.suspicious_patterns
-        return (
-            patterns.mixer_interaction or
-            patterns.rapid_draining or
-            patterns.unusual_activity or
-            patterns.new_wallet_high_value
-        )
+        return bool(signals.suspicious_patterns.flags & _NEGATIVE_SIGNAL_MASK)
@@ -1,13 +1,25 @@
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from fastapi.responses import PlainTextResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, ConfigDict, Field
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Tuple
+import logging
+import logging.handlers
 import os
+import queue
+import threading
 import time
+import orjson
 from dotenv import load_dotenv
 
 from agent.orchestrator import AgentOrchestrator
+from agent.rules import RuleBasedEngine
+from agent.batch import WalletBatch, evaluate_batch
 from agent.models import (
     AgentInput, WalletSignals, ProtocolHealthIndicators, MarketVolatilityFlags,
     RequestMetadata, CurrentBalance, PortfolioValue, TransactionVelocity,
@@ -17,7 +29,53 @@ from agent.models import (
 # Load environment variables
 load_dotenv()
 
-app = FastAPI()
+class ORJSONRequest(Request):
+    """Request whose JSON body is parsed with orjson instead of the stdlib"""
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+class ORJSONRoute(APIRoute):
+    """Route that hands endpoints an ORJSONRequest"""
+    def get_route_handler(self) -> Callable:
+        original_route_handler = super().get_route_handler()
+
+        async def orjson_route_handler(request: Request) -> Response:
+            return await original_route_handler(ORJSONRequest(request.scope, request.receive))
+
+        return orjson_route_handler
+
+# Request handlers (and the agent package) only enqueue log records; a
+# background thread (started in lifespan) writes them to stderr
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+_log_queue = queue.SimpleQueue()
+for _name in (__name__, "agent"):
+    logging.getLogger(_name).propagate = False
+    logging.getLogger(_name).addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_stream = logging.StreamHandler()
+_log_stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_stream)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    _log_listener.start()
+    try:
+        # Score a placeholder wallet before serving traffic, so JIT compilation
+        # (or the Numba cache load) doesn't land on the first real request.
+        # The stateless rule engine compiles the same kernels without
+        # building the orchestrator.
+        warmup_input = _build_agent_input(AnalyzeRequest(walletAddress="0x0", portfolio=Portfolio()))
+        RuleBasedEngine().calculate_risk_score(warmup_input)
+        evaluate_batch(WalletBatch.from_inputs([warmup_input]))
+        yield
+    finally:
+        # Flushes queued records before the process exits
+        _log_listener.stop()
+
+app = FastAPI(lifespan=lifespan)
+app.router.route_class = ORJSONRoute
 
 # Enable CORS for frontend
 app.add_middleware(
@@ -28,97 +86,210 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize Orchestrator
-api_key = os.getenv("OPENAI_API_KEY")
-orchestrator = AgentOrchestrator(llm_api_key=api_key)
+# One orchestrator per process, built on first use (its LLM client is created
+# lazily too, so startup and /healthz never pay for it)
+@lru_cache(maxsize=None)
+def get_orchestrator() -> AgentOrchestrator:
+    return AgentOrchestrator(llm_api_key=os.getenv("OPENAI_API_KEY"))
+
+# Context shared by every request (the frontend only sends basic wallet data).
+# Built once at import; the orchestrator only reads these, so sharing is safe.
+_DEFAULT_VELOCITY = TransactionVelocity(last_24h=0, last_7d=0, last_30d=0) # Placeholder
+_DEFAULT_SUSPICIOUS = SuspiciousPatterns()
+
+# Use intelligent defaults for Context (Simulation of Market Data)
+_DEFAULT_PROTOCOL_HEALTH = ProtocolHealthIndicators(
+    total_value_locked=1_000_000_000,
+    total_active_users=10000,
+    system_utilization_rate=50.0,
+    liquidity_depth=LiquidityDepth(tier1=1e6, tier2=1e7, tier3=1e8),
+    default_rate=2.0,
+    average_health_factor=2.0,
+    liquidation_events_24h=0
+)
+
+_DEFAULT_MARKET_VOLATILITY = MarketVolatilityFlags(
+    volatility_index=30.0,
+    market_sentiment='NEUTRAL',
+    gas_price=GasPrice(current=20.0, average_7d=20.0, percentile=50.0),
+    network_congestion='MEDIUM'
+)
+
+class Portfolio(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    wallet_age: int = Field(0, alias='walletAge')
+    transactions: int = 0
+    total_value: float = Field(0.0, alias='totalValue')
 
 class AnalyzeRequest(BaseModel):
     walletAddress: str
-    portfolio: Dict[str, Any]
+    portfolio: Portfolio
+
+class TokenBucketLimiter:
+    """Per-client token bucket: bursts up to the per-minute rate, refilled continuously"""
+
+    def __init__(self, requests_per_minute: int, max_clients: int = 10_000):
+        self.capacity = float(requests_per_minute)
+        self.refill_per_s = requests_per_minute / 60.0
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, client: str, cost: int = 1) -> bool:
+        """Take ``cost`` tokens from ``client``'s bucket, False if it holds fewer"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(client, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - last) * self.refill_per_s)
+            allowed = tokens >= cost
+            self._buckets[client] = (tokens - cost if allowed else tokens, now)
+
+            # Forget the least recently seen clients (a fresh bucket is full anyway)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+            return allowed
+
+_ANALYZE_RATE_PER_MINUTE = int(os.getenv("ANALYZE_RATE_PER_MINUTE", 30))
+_analyze_limiter = TokenBucketLimiter(_ANALYZE_RATE_PER_MINUTE)
+
+# Every wallet in a batch costs one token, so a batch can't exceed one bucket
+_MAX_BATCH_SIZE = min(int(os.getenv("MAX_BATCH_SIZE", _ANALYZE_RATE_PER_MINUTE)), _ANALYZE_RATE_PER_MINUTE)
+
+def _charge(request: Request, cost: int = 1) -> None:
+    """Take ``cost`` tokens from the caller's bucket or reject with 429
+
+    Buckets are keyed on request.client, the direct peer. uvicorn replaces
+    it with the X-Forwarded-For client only when the peer is listed in
+    FORWARDED_ALLOW_IPS (see __main__); list only your own proxies there,
+    since anything trusted can pick a fresh bucket per request.
+    """
+    client = request.client.host if request.client else "unknown"
+    if not _analyze_limiter.allow(client, cost):
+        raise HTTPException(status_code=429, detail="Rate limit exceeded")
+
+def rate_limit(request: Request) -> None:
+    _charge(request)
 
 @app.get("/")
 def read_root():
     return {"status": "active", "service": "Wallet Risk Analysis AI"}
 
-@app.post("/analyze")
-async def analyze_wallet(request: AnalyzeRequest):
-    try:
-        # Construct WalletSignals from simplified frontend data
-        # We use defaults for missing rich data since frontend only has basic Etherscan data
-        
-        wallet_signals = WalletSignals(
-            wallet_address=request.walletAddress,
-            first_seen_timestamp=int(time.time()) - (request.portfolio.get('walletAge', 0) * 86400),
-            age_in_days=request.portfolio.get('walletAge', 0),
-            total_transactions=request.portfolio.get('transactions', 0),
-            average_transactions_per_day=0.5, # Placeholder
-            last_activity_timestamp=int(time.time()), # Placeholder
-            days_since_last_activity=0,
-            current_balance=CurrentBalance(
-                native=0.0, 
-                stablecoins=0.0, 
-                total_usd=request.portfolio.get('totalValue', 0)
-            ),
-            portfolio_value=PortfolioValue(
-                tokens=0,
-                nfts=0,
-                defi=0,
-                total_usd=request.portfolio.get('totalValue', 0)
-            ),
-            transaction_velocity=TransactionVelocity(last_24h=0, last_7d=0, last_30d=0), # Placeholder
-            unique_contracts_interacted=0,
-            unique_addresses_interacted=0,
-            suspicious_patterns=SuspiciousPatterns(),
-            ens_name=None,
-            has_gitcoin_passport=False,
-            on_chain_reputation=50.0
-        )
+# Liveness probe for load balancers: no orchestrator, no JSON encoding
+@app.get("/healthz", response_class=PlainTextResponse)
+def healthz():
+    return "ok"
 
-        # Use intelligent defaults for Context (Simulation of Market Data)
-        protocol_health = ProtocolHealthIndicators(
-            total_value_locked=1_000_000_000,
-            total_active_users=10000,
-            system_utilization_rate=50.0,
-            liquidity_depth=LiquidityDepth(tier1=1e6, tier2=1e7, tier3=1e8),
-            default_rate=2.0,
-            average_health_factor=2.0,
-            liquidation_events_24h=0
-        )
+def _build_agent_input(request: AnalyzeRequest) -> AgentInput:
+    """Construct an AgentInput from simplified frontend data"""
+    # We use defaults for missing rich data since frontend only has basic Etherscan data
+    now = int(time.time())
+    portfolio = request.portfolio
+    wallet_age = portfolio.wallet_age
+    total_value = portfolio.total_value
 
-        market_volatility = MarketVolatilityFlags(
-            volatility_index=30.0,
-            market_sentiment='NEUTRAL',
-            gas_price=GasPrice(current=20.0, average_7d=20.0, percentile=50.0),
-            network_congestion='MEDIUM'
-        )
+    wallet_signals = WalletSignals(
+        wallet_address=request.walletAddress,
+        first_seen_timestamp=now - (wallet_age * 86400),
+        age_in_days=wallet_age,
+        total_transactions=portfolio.transactions,
+        average_transactions_per_day=0.5, # Placeholder
+        last_activity_timestamp=now, # Placeholder
+        days_since_last_activity=0,
+        current_balance=CurrentBalance(
+            native=0.0, 
+            stablecoins=0.0, 
+            total_usd=total_value
+        ),
+        portfolio_value=PortfolioValue(
+            tokens=0,
+            nfts=0,
+            defi=0,
+            total_usd=total_value
+        ),
+        transaction_velocity=_DEFAULT_VELOCITY,
+        unique_contracts_interacted=0,
+        unique_addresses_interacted=0,
+        suspicious_patterns=_DEFAULT_SUSPICIOUS,
+        ens_name=None,
+        has_gitcoin_passport=False,
+        on_chain_reputation=50.0
+    )
 
-        metadata = RequestMetadata(
-            request_id=f"req_{int(time.time())}",
-            timestamp=int(time.time()),
-            request_type='MANUAL_REVIEW',
-            requested_by="Frontend_User"
-        )
+    metadata = RequestMetadata(
+        request_id=f"req_{now}",
+        timestamp=now,
+        request_type='MANUAL_REVIEW',
+        requested_by="Frontend_User"
+    )
 
-        # Assemble Input
-        agent_input = AgentInput(
-            wallet_signals=wallet_signals,
-            protocol_health=protocol_health,
-            market_volatility=market_volatility,
-            metadata=metadata
-        )
+    # Assemble Input
+    return AgentInput(
+        wallet_signals=wallet_signals,
+        protocol_health=_DEFAULT_PROTOCOL_HEALTH,
+        market_volatility=_DEFAULT_MARKET_VOLATILITY,
+        metadata=metadata
+    )
+
+# Plain `def` endpoints: analysis is synchronous CPU work, so FastAPI runs it
+# in its threadpool instead of blocking the event loop
+@app.post("/analyze", dependencies=[Depends(rate_limit)])
+def analyze_wallet(
+    request: AnalyzeRequest,
+    orchestrator: AgentOrchestrator = Depends(get_orchestrator)
+):
+    try:
+        agent_input = _build_agent_input(request)
 
         # Run Agent Analysis
-        print(f"Analyzing wallet: {request.walletAddress}")
+        logger.info("Analyzing wallet: %s", request.walletAddress)
         result = orchestrator.analyze(agent_input)
         
-        return result.to_dict()
+        # Already-encoded JSON skips FastAPI's jsonable_encoder + json.dumps pass
+        return Response(content=result.to_json_bytes(), media_type="application/json")
+
+    except Exception as e:
+        logger.exception("analyze failed for wallet %s", request.walletAddress)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/analyze_batch")
+def analyze_wallets(
+    requests: List[AnalyzeRequest],
+    http_request: Request,
+    orchestrator: AgentOrchestrator = Depends(get_orchestrator)
+):
+    if len(requests) > _MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"At most {_MAX_BATCH_SIZE} wallets per batch")
+    _charge(http_request, len(requests))
+
+    try:
+        agent_inputs = [_build_agent_input(request) for request in requests]
+
+        # Vectorized rule-based scoring for the whole list, one batched LLM pass
+        logger.info("Analyzing %d wallets", len(agent_inputs))
+        results = orchestrator.analyze_batch(agent_inputs)
+
+        return Response(
+            content=orjson.dumps([result.to_dict() for result in results]),
+            media_type="application/json"
+        )
 
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("analyze_batch failed for %d wallets", len(requests))
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))  # Render sets PORT dynamically
-    print(f"Starting AI Agent API Server on port {port}...")
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    workers = int(os.getenv("WEB_CONCURRENCY", 1))  # keep 1 on Render's free tier
+    print(f"Starting AI Agent API Server on port {port} with {workers} worker(s)...")
+    # Multiple workers need the app as an import string. X-Forwarded-For is
+    # only honoured from FORWARDED_ALLOW_IPS (default: localhost); set it to
+    # the platform proxy's addresses to rate-limit per end user.
+    uvicorn.run(
+        "api_server:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=port,
+        workers=workers,
+        proxy_headers=True,
+        forwarded_allow_ips=os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+    )
@@ -7,18 +7,33 @@ Demonstrates complete workflow: Agent → iExec → Smart Contract
 import sys
 import os
 import asyncio
+import logging
 import time
 
 # Add parent directory to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
 
 from agent import *
 from integration.orchestrator import EndToEndOrchestrator
 
 
+# Shared nested market/protocol fixtures (immutable, so safe to reuse across scenarios)
+_LD_DEEP = LiquidityDepth(tier1=50_000_000, tier2=100_000_000, tier3=150_000_000)
+_LD_REDUCED = LiquidityDepth(tier1=35_000_000, tier2=70_000_000, tier3=100_000_000)
+_LD_THIN = LiquidityDepth(tier1=20_000_000, tier2=40_000_000, tier3=60_000_000)
+
+_GAS_NORMAL = GasPrice(current=25.0, average_7d=30.0, percentile=40.0)
+_GAS_ELEVATED = GasPrice(current=65.0, average_7d=30.0, percentile=85.0)
+_GAS_SPIKE = GasPrice(current=180.0, average_7d=35.0, percentile=98.0)
+
+
 async def demo_scenario_1_low_risk():
     """Scenario 1: Low Risk Wallet (Local Analysis Only)"""
     
+    now = int(time.time())
+    
     print("\n" + "="*70)
     print("SCENARIO 1: Established Low-Risk Wallet")
     print("="*70)
@@ -31,11 +46,11 @@ async def demo_scenario_1_low_risk():
         wallet_address="0x742d35Cc6634C0532925a3b844Bc9e7595f0bEb",
         wallet_signals=WalletSignals(
             wallet_address="0x742d35Cc6634C0532925a3b844Bc9e7595f0bEb",
-            first_seen_timestamp=int(time.time()) - (500 * 86400),
+            first_seen_timestamp=now - (500 * 86400),
             age_in_days=500,
             total_transactions=1250,
             average_transactions_per_day=2.5,
-            last_activity_timestamp=int(time.time()) - 3600,
+            last_activity_timestamp=now - 3600,
             days_since_last_activity=0,
             current_balance=CurrentBalance(
                 native=2.5,
@@ -64,11 +79,7 @@ async def demo_scenario_1_low_risk():
             total_value_locked=500_000_000,
             total_active_users=50000,
             system_utilization_rate=65.0,
-            liquidity_depth=LiquidityDepth(
-                tier1=50_000_000,
-                tier2=100_000_000,
-                tier3=150_000_000
-            ),
+            liquidity_depth=_LD_DEEP,
             default_rate=1.2,
             average_health_factor=2.5,
             liquidation_events_24h=3
@@ -76,12 +87,12 @@ async def demo_scenario_1_low_risk():
         market_volatility=MarketVolatilityFlags(
             volatility_index=35.0,
             market_sentiment='NEUTRAL',
-            gas_price=GasPrice(current=25.0, average_7d=30.0, percentile=40.0),
+            gas_price=_GAS_NORMAL,
             network_congestion='MEDIUM'
         ),
         metadata=RequestMetadata(
             request_id="req_scenario_1",
-            timestamp=int(time.time()),
+            timestamp=now,
             request_type='NEW_LOAN',
             requested_by="0xLendingProtocol"
         )
@@ -93,7 +104,7 @@ async def demo_scenario_1_low_risk():
     print(f"   Confidence: {result['analysis']['confidence']:.1f}%")
     if result['transaction']:
         tx_hash = result['transaction']['transactionHash']
-        print(f"   TX Hash: {tx_hash[:16] if isinstance(tx_hash, str) else tx_hash.hex()[:16]}...")
+        print(f"   TX Hash: {tx_hash[:16]}...")
     else:
         print(f"   On-Chain: Not required (low risk)")
 
@@ -101,6 +112,8 @@ async def demo_scenario_1_low_risk():
 async def demo_scenario_2_high_risk():
     """Scenario 2: High Risk Case (Requires iExec)"""
     
+    now = int(time.time())
+    
     print("\n" + "="*70)
     print("SCENARIO 2: High-Risk Wallet (iExec Analysis Required)")
     print("="*70)
@@ -113,11 +126,11 @@ async def demo_scenario_2_high_risk():
         wallet_address="0xHighRisk123456789abcdef",
         wallet_signals=WalletSignals(
             wallet_address="0xHighRisk123456789abcdef",
-            first_seen_timestamp=int(time.time()) - (90 * 86400),
+            first_seen_timestamp=now - (90 * 86400),
             age_in_days=90,
             total_transactions=800,
             average_transactions_per_day=8.9,
-            last_activity_timestamp=int(time.time()) - 1800,
+            last_activity_timestamp=now - 1800,
             days_since_last_activity=0,
             current_balance=CurrentBalance(
                 native=0.5,
@@ -151,11 +164,7 @@ async def demo_scenario_2_high_risk():
             total_value_locked=500_000_000,
             total_active_users=50000,
             system_utilization_rate=75.0,
-            liquidity_depth=LiquidityDepth(
-                tier1=35_000_000,
-                tier2=70_000_000,
-                tier3=100_000_000
-            ),
+            liquidity_depth=_LD_REDUCED,
             default_rate=3.5,
             average_health_factor=2.0,
             liquidation_events_24h=15
@@ -163,12 +172,12 @@ async def demo_scenario_2_high_risk():
         market_volatility=MarketVolatilityFlags(
             volatility_index=72.0,
             market_sentiment='FEAR',
-            gas_price=GasPrice(current=65.0, average_7d=30.0, percentile=85.0),
+            gas_price=_GAS_ELEVATED,
             network_congestion='HIGH'
         ),
         metadata=RequestMetadata(
             request_id="req_scenario_2",
-            timestamp=int(time.time()),
+            timestamp=now,
             request_type='POSITION_REVIEW',
             requested_by="0xLendingProtocol",
             urgency='HIGH'
@@ -189,6 +198,8 @@ async def demo_scenario_2_high_risk():
 async def demo_scenario_3_critical():
     """Scenario 3: Critical Risk (Auto-Pause)"""
     
+    now = int(time.time())
+    
     print("\n" + "="*70)
     print("SCENARIO 3: Critical Risk Wallet (Auto-Pause)")
     print("="*70)
@@ -201,11 +212,11 @@ async def demo_scenario_3_critical():
         wallet_address="0xCritical987654321",
         wallet_signals=WalletSignals(
             wallet_address="0xCritical987654321",
-            first_seen_timestamp=int(time.time()) - (120 * 86400),
+            first_seen_timestamp=now - (120 * 86400),
             age_in_days=120,
             total_transactions=600,
             average_transactions_per_day=5.0,
-            last_activity_timestamp=int(time.time()) - 900,
+            last_activity_timestamp=now - 900,
             days_since_last_activity=0,
             current_balance=CurrentBalance(
                 native=0.3,
@@ -236,11 +247,7 @@ async def demo_scenario_3_critical():
             total_value_locked=450_000_000,
             total_active_users=48000,
             system_utilization_rate=88.0,
-            liquidity_depth=LiquidityDepth(
-                tier1=20_000_000,
-                tier2=40_000_000,
-                tier3=60_000_000
-            ),
+            liquidity_depth=_LD_THIN,
             default_rate=4.5,
             average_health_factor=1.7,
             liquidation_events_24h=35
@@ -251,12 +258,12 @@ async def demo_scenario_3_critical():
             flash_crash_detected=True,
             large_liquidations_in_progress=True,
             estimated_liquidation_cascade=80_000_000,
-            gas_price=GasPrice(current=180.0, average_7d=35.0, percentile=98.0),
+            gas_price=_GAS_SPIKE,
             network_congestion='EXTREME'
         ),
         metadata=RequestMetadata(
             request_id="req_scenario_3",
-            timestamp=int(time.time()),
+            timestamp=now,
             request_type='SCHEDULED_CHECK',
             requested_by="0xLendingProtocol",
             urgency='HIGH'
@@ -304,4 +311,6 @@ async def main():
 
 
 if __name__ == "__main__":
+    # Show the orchestrator's phase-by-phase progress
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO, format="%(message)s")
     asyncio.run(main())
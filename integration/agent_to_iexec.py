@@ -15,29 +15,41 @@ class AgentIExecBridge:
     Bridge between local agent and iExec integration
     """
     
-    def __init__(self, iexec_config: Optional[dict] = None, contract_address: Optional[str] = None):
+    def __init__(
+        self,
+        iexec_config: Optional[dict] = None,
+        contract_address: Optional[str] = None,
+        simulate_latency_s: float = 0.0
+    ):
         self.local_agent = AgentOrchestrator()
         self.iexec_config = iexec_config or {}
         self.contract_address = contract_address
+        self.simulate_latency_s = simulate_latency_s
     
     async def analyze_wallet(self, agent_input: AgentInput) -> AgentOutput:
         """
         Analyze wallet with automatic iExec escalation if needed
         """
-        # Try local first
-        local_result = self.local_agent.analyze(agent_input)
+        # Try local first (in a worker thread, so concurrent analyses don't block the loop)
+        local_result = await asyncio.to_thread(self.local_agent.analyze, agent_input)
         
         # Check if needs iExec
         if local_result.decision == 'REQUEST_SEVERITY_ANALYSIS':
             # Escalate to iExec (mock for now)
-            return await self._mock_iexec_analysis(agent_input)
+            return await self._mock_iexec_analysis(agent_input, local_result)
         
         return local_result
     
-    async def _mock_iexec_analysis(self, agent_input: AgentInput) -> AgentOutput:
-        """Mock iExec analysis"""
-        await asyncio.sleep(2)  # Simulate delay
+    async def _mock_iexec_analysis(
+        self,
+        agent_input: AgentInput,
+        local_result: Optional[AgentOutput] = None
+    ) -> AgentOutput:
+        """Mock iExec analysis (reuses ``local_result`` when the caller already has it)"""
+        if self.simulate_latency_s:
+            await asyncio.sleep(self.simulate_latency_s)  # Simulate delay
         
         # Return enhanced result
-        local = self.local_agent.analyze(agent_input)
-        return local
+        if local_result is None:
+            local_result = self.local_agent.analyze(agent_input)
+        return local_result
@@ -5,20 +5,31 @@ Coordinates: Agent → iExec → Smart Contract
 """
 
 import asyncio
-import json
+import logging
 import time
-import hashlib
-from typing import Dict, Optional
+from collections import deque
+from typing import Dict, List, Optional
 
-import sys
-import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import orjson
+
+try:
+    # SIMD tree hash when installed; the tx hash is only a simulated identifier
+    from blake3 import blake3 as _tx_hasher
+except ImportError:
+    # BLAKE2b beats SHA-256 in software on CPUs without SHA extensions
+    from functools import partial
+    from hashlib import blake2b
+    _tx_hasher = partial(blake2b, digest_size=32)
 
 from agent import (
     AgentOrchestrator, AgentInput, AgentOutput,
     WalletSignals, ProtocolHealthIndicators,
-    MarketVolatilityFlags, RequestMetadata
+    MarketVolatilityFlags, RequestMetadata, ResultCache
 )
+from agent.cache import input_fingerprint, ttl_for_market
+
+# Progress is reported at INFO; callers that want it on the console configure logging
+logger = logging.getLogger(__name__)
 
 
 class MockIExecIntegration:
@@ -27,23 +38,41 @@ class MockIExecIntegration:
     In production, this would use the real iExec SDK
     """
     
-    async def analyze_with_iexec(self, agent_input: AgentInput, timeout: int = 300):
-        """Simulate iExec analysis"""
-        print("   📤 Sending to iExec TEE...")
-        await asyncio.sleep(2)  # Simulate network delay
-        
-        print("   🔐 Encrypting data...")
-        await asyncio.sleep(1)
-        
-        print("   ⚙️  TEE processing...")
-        await asyncio.sleep(3)  # Simulate TEE execution
-        
-        print("   🔓 Decrypting result...")
-        await asyncio.sleep(1)
+    def __init__(
+        self,
+        simulate_latency_s: float = 0.0,
+        local_agent: Optional[AgentOrchestrator] = None
+    ):
+        """
+        Args:
+            simulate_latency_s: Artificial delay per simulated iExec step (0 = none)
+            local_agent: Orchestrator used when no local result is passed in
+                (one is created if omitted)
+        """
+        self.simulate_latency_s = simulate_latency_s
+        self.local_agent = local_agent if local_agent is not None else AgentOrchestrator()
+    
+    async def _simulate_step(self, message: str) -> None:
+        """Report one simulated iExec step, optionally waiting like the real one"""
+        logger.info(message)
+        if self.simulate_latency_s:
+            await asyncio.sleep(self.simulate_latency_s)
+    
+    async def analyze_with_iexec(
+        self,
+        agent_input: AgentInput,
+        timeout: int = 300,
+        local_result: Optional[AgentOutput] = None
+    ):
+        """Simulate iExec analysis (reuses ``local_result`` when the caller already has it)"""
+        await self._simulate_step("   📤 Sending to iExec TEE...")
+        await self._simulate_step("   🔐 Encrypting data...")
+        await self._simulate_step("   ⚙️  TEE processing...")
+        await self._simulate_step("   🔓 Decrypting result...")
         
         # Simulate iExec result (enhanced analysis)
-        base_orchestrator = AgentOrchestrator()
-        local_result = base_orchestrator.analyze(agent_input)
+        if local_result is None:
+            local_result = self.local_agent.analyze(agent_input)
         
         # Simulate LLM enhancement - create new output with updated values
         enhanced_score = min(local_result.risk_score * 1.1, 100)
@@ -53,30 +82,43 @@ class MockIExecIntegration:
             confidence=min(local_result.confidence + 10, 100),
             reasoning=f"{local_result.reasoning} [Enhanced by iExec TEE analysis]",
             risk_score=enhanced_score,
-            recommendations=local_result.recommendations + ["iExec verification completed"],
-            flags=local_result.flags + ["IEXEC_VERIFIED"],
+            recommendations=[*local_result.recommendations, "iExec verification completed"],
+            flags=[*local_result.flags, "IEXEC_VERIFIED"],
             timestamp=int(time.time()),
             metadata=local_result.metadata
         )
 
 
+_RULE = "=" * 60
+
+# Event emitted for a submitted result: first entry whose minimum risk score is met
+_RISK_EVENTS = (
+    (80, "   🚨 Event: CriticalRiskDetected"),
+    (60, "   ⚠️  Event: HighRiskDetected"),
+    (float('-inf'), "   ℹ️  Event: RiskAssessmentRecorded"),
+)
+
+
 class MockContractBridge:
     """
     Mock smart contract bridge for demonstration
     In production, this would interact with real deployed contract
     """
     
-    def __init__(self, contract_address: str):
+    def __init__(self, contract_address: str, max_history: int = 1024):
         self.contract_address = contract_address
-        self.submitted_results = []
+        self._address_prefix = contract_address[:10]
+        
+        # Most recent submissions only, so long-running orchestrators don't grow unbounded
+        self.submitted_results = deque(maxlen=max_history)
     
     def submit_result(self, result_dict: Dict, task_id: str, task_proof: bytes):
         """Simulate contract submission"""
-        print(f"   📝 Submitting to contract: {self.contract_address[:10]}...")
+        logger.info("   📝 Submitting to contract: %s...", self._address_prefix)
         
         # Simulate transaction
-        tx_hash_bytes = hashlib.sha256(json.dumps(result_dict).encode()).digest()
-        tx_hash = tx_hash_bytes.hex()
+        payload = orjson.dumps(result_dict, option=orjson.OPT_SORT_KEYS)
+        tx_hash = '0x' + _tx_hasher(payload).hexdigest()
         
         receipt = {
             'transactionHash': tx_hash,
@@ -93,15 +135,11 @@ class MockContractBridge:
             'receipt': receipt
         })
         
-        print(f"   ✅ Transaction confirmed: {tx_hash[:16]}...")
+        logger.info("   ✅ Transaction confirmed: %s...", tx_hash[:16])
         
         # Simulate event emission
-        if result_dict['risk_score'] >= 80:
-            print(f"   🚨 Event: CriticalRiskDetected")
-        elif result_dict['risk_score'] >= 60:
-            print(f"   ⚠️  Event: HighRiskDetected")
-        else:
-            print(f"   ℹ️  Event: RiskAssessmentRecorded")
+        risk_score = result_dict['risk_score']
+        logger.info(next(event for min_score, event in _RISK_EVENTS if risk_score >= min_score))
         
         return receipt
 
@@ -115,11 +153,20 @@ class EndToEndOrchestrator:
     def __init__(
         self,
         iexec_config: Optional[Dict] = None,
-        contract_address: str = "0x0000000000000000000000000000000000000000"
+        contract_address: str = "0x0000000000000000000000000000000000000000",
+        result_cache: Optional[ResultCache] = None,
+        simulate_latency_s: float = 0.0
     ):
-        self.iexec_integration = MockIExecIntegration()
-        self.contract_bridge = MockContractBridge(contract_address)
         self.local_agent = AgentOrchestrator()
+        self.iexec_integration = MockIExecIntegration(simulate_latency_s, self.local_agent)
+        self.contract_bridge = MockContractBridge(contract_address)
+        
+        # Finished responses (analysis + receipt) keyed by input fingerprint, so
+        # an unchanged wallet snapshot skips both analysis phases. They are
+        # stored as JSON bytes: every hit decodes a fresh dict, so callers can't
+        # mutate the cached copy. A hit is not submitted to the contract again -
+        # the snapshot is already on-chain and the original receipt is returned.
+        self.result_cache = result_cache if result_cache is not None else ResultCache()
     
     async def process_wallet_analysis(
         self,
@@ -135,9 +182,7 @@ class EndToEndOrchestrator:
         Returns:
             Dictionary with analysis result and transaction receipt
         """
-        print(f"\n{'='*60}")
-        print(f"🔍 WALLET ANALYSIS: {wallet_address[:16]}...")
-        print(f"{'='*60}\n")
+        logger.info("\n%s\n🔍 WALLET ANALYSIS: %s...\n%s\n", _RULE, wallet_address[:16], _RULE)
         
         # Build agent input
         agent_input = AgentInput(
@@ -147,55 +192,140 @@ class EndToEndOrchestrator:
             metadata=metadata
         )
         
-        # Step 1: Local Agent Analysis
-        print("📊 Phase 1: Local Agent Analysis")
-        local_result = self.local_agent.analyze(agent_input)
+        cache_key = input_fingerprint(agent_input)
+        cached = self.result_cache.get(cache_key)
         
-        print(f"   Decision: {local_result.decision}")
-        print(f"   Risk Score: {local_result.risk_score:.1f}/100")
-        print(f"   Confidence: {local_result.confidence:.1f}%")
+        if cached is not None:
+            response = orjson.loads(cached)
+            logger.info("📊 Phases 1-3: Reusing cached result of this wallet snapshot")
+            logger.info("   Decision: %s", response['analysis']['decision'])
+            logger.info("   Risk Score: %.1f/100", response['analysis']['risk_score'])
+            return response
         
-        # Step 2: Check if iExec needed
-        needs_iexec = (
-            local_result.decision == 'REQUEST_SEVERITY_ANALYSIS' or
-            local_result.risk_score >= 60
-        )
+        final_result = await self._analyze(agent_input)
+        return orjson.loads(self._submit_and_cache(cache_key, agent_input, final_result))
+    
+    async def process_wallet_batch(self, agent_inputs: List[AgentInput]) -> List[Dict]:
+        """
+        End-to-end processing for many wallets at once
         
-        if needs_iexec:
-            print(f"\n📤 Phase 2: iExec Severity Analysis")
-            
-            # Send to iExec
-            iexec_result = await self.iexec_integration.analyze_with_iexec(
-                agent_input,
-                timeout=300
+        Uncached wallets are analyzed locally in one vectorized batch (off
+        the event loop), and every escalation runs through iExec concurrently.
+        Repeated snapshots in the batch are analyzed and submitted once.
+        
+        Returns:
+            One dictionary per input, in order, as from process_wallet_analysis
+        """
+        cache_keys = [input_fingerprint(agent_input) for agent_input in agent_inputs]
+        cached = [self.result_cache.get(cache_key) for cache_key in cache_keys]
+        
+        # First index of each uncached snapshot; later duplicates reuse its result
+        first_miss: Dict[str, int] = {}
+        for i, (cache_key, hit) in enumerate(zip(cache_keys, cached)):
+            if hit is None:
+                first_miss.setdefault(cache_key, i)
+        misses = list(first_miss.values())
+        
+        final_results: Dict[int, AgentOutput] = {}
+        if misses:
+            logger.info("📊 Phase 1: Local Agent Analysis (%d wallets)", len(misses))
+            local_results = await asyncio.to_thread(
+                self.local_agent.analyze_batch, [agent_inputs[i] for i in misses]
             )
+            for i, local_result in zip(misses, local_results):
+                final_results[i] = local_result
             
-            final_result = iexec_result
-            print(f"   Enhanced Risk Score: {final_result.risk_score:.1f}/100")
-            print(f"   Enhanced Confidence: {final_result.confidence:.1f}%")
-        else:
-            final_result = local_result
-            print(f"\n✅ Local analysis sufficient - no iExec needed")
+            escalated = [i for i in misses if self._needs_iexec(final_results[i])]
+            if escalated:
+                logger.info("\n📤 Phase 2: iExec Severity Analysis (%d wallets)", len(escalated))
+                iexec_results = await asyncio.gather(*(
+                    self.iexec_integration.analyze_with_iexec(
+                        agent_inputs[i],
+                        timeout=300,
+                        local_result=final_results[i]
+                    )
+                    for i in escalated
+                ))
+                for i, iexec_result in zip(escalated, iexec_results):
+                    final_results[i] = iexec_result
+        
+        # Only fresh results go to the contract; hits return their original receipt
+        snapshots: Dict[str, bytes] = {}
+        for i in misses:
+            snapshots[cache_keys[i]] = self._submit_and_cache(cache_keys[i], agent_inputs[i], final_results[i])
+        
+        return [
+            orjson.loads(hit if hit is not None else snapshots[cache_key])
+            for cache_key, hit in zip(cache_keys, cached)
+        ]
+    
+    @staticmethod
+    def _needs_iexec(local_result: AgentOutput) -> bool:
+        """Whether a local result should be escalated to iExec"""
+        return (
+            local_result.decision == 'REQUEST_SEVERITY_ANALYSIS' or
+            local_result.risk_score >= 60
+        )
+    
+    def _submit_and_cache(self, cache_key: str, agent_input: AgentInput, final_result: AgentOutput) -> bytes:
+        """Submit a fresh result and cache the response as an immutable JSON snapshot"""
+        snapshot = orjson.dumps(self._submit(final_result, agent_input.metadata))
+        ttl = ttl_for_market(agent_input.market_volatility)
+        self.result_cache.set(cache_key, snapshot, ttl)
+        return snapshot
+    
+    def _submit(self, final_result: AgentOutput, metadata: RequestMetadata) -> Dict:
+        """Submit significant results to the contract and build the response"""
+        # Serialized once: submitted to the contract and returned to the caller
+        analysis = final_result.to_dict()
         
         # Step 3: Submit to Smart Contract (if significant risk)
         if final_result.risk_score >= 25:  # MEDIUM or higher
-            print(f"\n📝 Phase 3: Smart Contract Submission")
+            logger.info("\n📝 Phase 3: Smart Contract Submission")
             
             receipt = self.contract_bridge.submit_result(
-                final_result.to_dict(),
+                analysis,
                 task_id=metadata.request_id,
                 task_proof=b"mock_proof"
             )
             
             return {
-                'analysis': final_result.to_dict(),
+                'analysis': analysis,
                 'transaction': receipt,
                 'contract_address': self.contract_bridge.contract_address
             }
         else:
-            print(f"\n✅ Risk too low - no contract submission needed")
+            logger.info("\n✅ Risk too low - no contract submission needed")
             return {
-                'analysis': final_result.to_dict(),
+                'analysis': analysis,
                 'transaction': None,
                 'contract_address': None
             }
+    
+    async def _analyze(self, agent_input: AgentInput) -> AgentOutput:
+        """Local analysis, escalated to iExec when the result calls for it"""
+        # Step 1: Local Agent Analysis
+        logger.info("📊 Phase 1: Local Agent Analysis")
+        local_result = await asyncio.to_thread(self.local_agent.analyze, agent_input)
+        
+        logger.info("   Decision: %s", local_result.decision)
+        logger.info("   Risk Score: %.1f/100", local_result.risk_score)
+        logger.info("   Confidence: %.1f%%", local_result.confidence)
+        
+        # Step 2: Check if iExec needed
+        if not self._needs_iexec(local_result):
+            logger.info("\n✅ Local analysis sufficient - no iExec needed")
+            return local_result
+        
+        logger.info("\n📤 Phase 2: iExec Severity Analysis")
+        
+        # Send to iExec
+        iexec_result = await self.iexec_integration.analyze_with_iexec(
+            agent_input,
+            timeout=300,
+            local_result=local_result
+        )
+        
+        logger.info("   Enhanced Risk Score: %.1f/100", iexec_result.risk_score)
+        logger.info("   Enhanced Confidence: %.1f%%", iexec_result.confidence)
+        return iexec_result
@@ -0,0 +1,121 @@
+"""
+Tests for vectorized batch scoring (agent.batch)
+"""
+
+import math
+from dataclasses import replace
+
+import pytest
+
+from agent import (
+    RuleBasedEngine,
+    AgentInput,
+    WalletSignals,
+    ProtocolHealthIndicators,
+    MarketVolatilityFlags,
+    RequestMetadata,
+    CurrentBalance,
+    PortfolioValue,
+    TransactionVelocity,
+    SuspiciousPatterns,
+    LendingBorrowing,
+    LiquidityDepth,
+    GasPrice,
+)
+from agent.batch import WalletBatch, evaluate_batch, _quantize
+from agent.rules import DECISIONS
+
+
+def _make_input(health_factor: float = 1.5) -> AgentInput:
+    """A borrowing wallet in a volatile market (close to the critical blocker)"""
+    wallet_signals = WalletSignals(
+        wallet_address="0x0000000000000000000000000000000000000001",
+        first_seen_timestamp=0,
+        age_in_days=120,
+        total_transactions=300,
+        average_transactions_per_day=2.5,
+        last_activity_timestamp=0,
+        days_since_last_activity=1,
+        current_balance=CurrentBalance(native=1.0, stablecoins=500.0, total_usd=2500.0),
+        portfolio_value=PortfolioValue(tokens=2000.0, nfts=0.0, defi=500.0, total_usd=2500.0),
+        transaction_velocity=TransactionVelocity(last_24h=3, last_7d=20, last_30d=75),
+        unique_contracts_interacted=12,
+        unique_addresses_interacted=40,
+        suspicious_patterns=SuspiciousPatterns(),
+        lending_borrowing=LendingBorrowing(
+            total_borrowed=1000.0,
+            total_collateral=1500.0,
+            health_factor=health_factor
+        ),
+        on_chain_reputation=60.0
+    )
+    protocol_health = ProtocolHealthIndicators(
+        total_value_locked=1e9,
+        total_active_users=10000,
+        system_utilization_rate=50.0,
+        liquidity_depth=LiquidityDepth(tier1=1e6, tier2=1e7, tier3=1e8),
+        default_rate=2.0,
+        average_health_factor=2.0,
+        liquidation_events_24h=5
+    )
+    market_volatility = MarketVolatilityFlags(
+        volatility_index=75.0,
+        market_sentiment='FEAR',
+        gas_price=GasPrice(current=20.0, average_7d=20.0, percentile=50.0),
+        network_congestion='MEDIUM'
+    )
+    metadata = RequestMetadata(
+        request_id="test",
+        timestamp=0,
+        request_type='SCHEDULED_CHECK',
+        requested_by="tests"
+    )
+    return AgentInput(wallet_signals, protocol_health, market_volatility, metadata)
+
+
+def _assert_matches_scalar(inputs):
+    """Batch scores and decisions equal the per-wallet rule engine"""
+    engine = RuleBasedEngine()
+    scores, decisions, _ = evaluate_batch(WalletBatch.from_inputs(inputs))
+
+    for agent_input, score, decision in zip(inputs, scores, decisions):
+        expected_score = engine.calculate_risk_score(agent_input)
+        expected_decision, _ = engine.map_score_to_decision(
+            expected_score,
+            agent_input.wallet_signals,
+            agent_input.protocol_health,
+            agent_input.market_volatility
+        )
+        assert score == pytest.approx(expected_score)
+        assert DECISIONS[decision] == expected_decision
+
+
+@pytest.mark.parametrize("value, upper, expected", [
+    (70.0, 127, 70),
+    (70.2, 127, 71),
+    (-3.0, 127, 0),
+    (500.0, 127, 127),
+    (math.nan, 127, 0),
+    (math.inf, 127, 127),
+    (-math.inf, 127, 0),
+])
+def test_quantize(value, upper, expected):
+    assert _quantize(value, upper) == expected
+
+
+def test_nan_health_factor_matches_scalar():
+    inputs = [_make_input(math.nan), _make_input(1.0), _make_input(1.5)]
+    _assert_matches_scalar(inputs)
+
+
+def test_non_finite_quantized_fields_match_scalar():
+    base = _make_input()
+    inputs = []
+    for value in (math.nan, math.inf, -math.inf):
+        inputs.append(replace(
+            base,
+            wallet_signals=replace(base.wallet_signals, on_chain_reputation=value, credit_score=value),
+            protocol_health=replace(base.protocol_health, default_rate=value),
+            market_volatility=replace(base.market_volatility, volatility_index=value)
+        ))
+    _assert_matches_scalar(inputs)